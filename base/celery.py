@@ -22,8 +22,24 @@ app.conf.beat_schedule = {
         "task": "garden.tasks.process_garden_updates",
         "schedule": 350.0,
     },
+    "catch_up_garden_growth": {
+        "task": "garden.tasks.catch_up_garden_growth",
+        "schedule": 1800.0, # Replays ticks lost to downtime
+    },
     "monitor_user_activities": {
         "task": "blockchain.tasks.monitor_user_activities",
         "schedule": 60.0,
     },
+    "roll_garden_pests": {
+        "task": "garden.tasks.roll_garden_pests",
+        "schedule": 60.0,
+    },
+    "prune_plant_tombstones": {
+        "task": "garden.tasks.prune_plant_tombstones",
+        "schedule": 3600.0,
+    },
+    "compact_time_series": {
+        "task": "blockchain.tasks.compact_time_series",
+        "schedule": 600.0,
+    },
 }
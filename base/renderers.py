@@ -0,0 +1,59 @@
+"""
+JSON rendering backed by orjson.
+Output is byte-for-byte what DRF's JSONRenderer produces; the rare payloads
+orjson would spell differently are handed back to JSONRenderer.
+"""
+
+from rest_framework.renderers import JSONRenderer
+import math
+import orjson
+import re
+
+
+# orjson writes floats below 1e-4 without an exponent and large exponents
+# without a sign, and leaves U+2028/U+2029 unescaped; any output that may
+# contain one of these is rendered by JSONRenderer instead
+MISMATCH = re.compile(rb"0\.0000|\de[-\d]|\xe2\x80[\xa8\xa9]")
+
+
+def has_non_finite_float(data):
+    """Whether NaN or an infinity appears anywhere in the data"""
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        return any(has_non_finite_float(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(has_non_finite_float(value) for value in data)
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        if (
+            self.ensure_ascii
+            or not self.compact
+            or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+        ):
+            # Non-default JSON settings are only honoured by JSONRenderer
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data,
+                # DRF's encoder formats dates, times and everything orjson
+                # does not support natively
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if MISMATCH.search(content):
+            return super().render(data, accepted_media_type, renderer_context)
+        # orjson writes NaN and infinities as null where the strict
+        # JSONRenderer refuses them, so let it raise
+        if b"null" in content and has_non_finite_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        return content
@@ -145,6 +145,10 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Rest Framework configuration
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "base.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "user.authentication.WalletTokenAuthentication",
     ],
@@ -170,6 +174,63 @@ ABSTRACT = {
     "EXPLORER_API_URL": os.getenv("ABSTRACT_EXPLORER_API_URL"),
 }
 
+# Blockchain Monitoring Configuration
+BLOCKCHAIN_MONITOR = {
+    # Explorer requests in flight at once during an activity monitoring run
+    "CONCURRENCY": int(os.getenv("BLOCKCHAIN_MONITOR_CONCURRENCY", "20")),
+    "REQUEST_TIMEOUT": int(os.getenv("BLOCKCHAIN_MONITOR_REQUEST_TIMEOUT", "50")),
+    # Keep-alive connections pooled per host by each process's HTTP clients
+    "POOL_SIZE": int(os.getenv("BLOCKCHAIN_MONITOR_POOL_SIZE", "10")),
+    # "explorer" polls each wallet's transactions, "blocks" scans every new
+    # block once and matches it against the known garden wallets
+    "ACTIVITY_SOURCE": os.getenv("BLOCKCHAIN_MONITOR_ACTIVITY_SOURCE", "explorer"),
+    # Explorer transactions per page, and pages read per garden per run
+    "EXPLORER_PAGE_SIZE": int(os.getenv("BLOCKCHAIN_MONITOR_PAGE_SIZE", "100")),
+    "EXPLORER_MAX_PAGES": int(os.getenv("BLOCKCHAIN_MONITOR_MAX_PAGES", "10")),
+    # Blocks averaged by the rolling network metrics window
+    "METRICS_WINDOW": int(os.getenv("BLOCKCHAIN_MONITOR_METRICS_WINDOW", "20")),
+    "MAX_BLOCKS_PER_RUN": int(os.getenv("BLOCKCHAIN_MONITOR_MAX_BLOCKS", "100")),
+    # Seconds between full rebuilds of the in-memory wallet index
+    "WALLET_INDEX_REFRESH": int(os.getenv("BLOCKCHAIN_MONITOR_WALLET_REFRESH", "3600")),
+    # Gardens written per bulk update when applying monitoring results
+    "BATCH_SIZE": int(os.getenv("BLOCKCHAIN_MONITOR_BATCH_SIZE", "500")),
+}
+
+# Time-series Retention Configuration
+TIME_SERIES = {
+    # Days raw samples and minute/hour rollups are kept; day rollups are kept
+    "RAW_RETENTION_DAYS": int(os.getenv("TIME_SERIES_RAW_RETENTION_DAYS", "2")),
+    "MINUTE_RETENTION_DAYS": int(os.getenv("TIME_SERIES_MINUTE_RETENTION_DAYS", "8")),
+    "HOUR_RETENTION_DAYS": int(os.getenv("TIME_SERIES_HOUR_RETENTION_DAYS", "90")),
+}
+
+# Garden Growth Configuration
+GARDEN = {
+    # Number of plants loaded, computed and written back per growth chunk
+    "GROWTH_CHUNK_SIZE": int(os.getenv("GARDEN_GROWTH_CHUNK_SIZE", "2000")),
+    # Length of one growth tick, matching the process_garden_updates schedule
+    "GROWTH_TICK_SECONDS": int(os.getenv("GARDEN_GROWTH_TICK_SECONDS", "350")),
+    # Number of Garden.id ranges the growth cycle fans out to (1 = serial)
+    "GROWTH_SHARDS": int(os.getenv("GARDEN_GROWTH_SHARDS", "1")),
+    # "python" computes growth in NumPy chunks, "sql" runs it as set-based
+    # UPDATEs inside PostgreSQL
+    "GROWTH_ENGINE": os.getenv("GARDEN_GROWTH_ENGINE", "python"),
+    # "eager" grows every plant each tick, "lazy" only grows plants when
+    # their garden is read or touched by an activity
+    "GROWTH_MODE": os.getenv("GARDEN_GROWTH_MODE", "eager"),
+    # Oldest missed tick replayed when catching a garden up (about a week)
+    "MAX_CATCH_UP_TICKS": int(os.getenv("GARDEN_MAX_CATCH_UP_TICKS", "1728")),
+    # Days plant tombstones are kept for delta reads; clients that last
+    # synced before the pruned ones get the whole garden again
+    "TOMBSTONE_RETENTION_DAYS": int(
+        os.getenv("GARDEN_TOMBSTONE_RETENTION_DAYS", "7")
+    ),
+    # Optional seed for the pest roll, for reproducible runs
+    "PEST_SEED": (
+        int(os.getenv("GARDEN_PEST_SEED")) if os.getenv("GARDEN_PEST_SEED") else None
+    ),
+}
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [f"https://{os.getenv('CORS_ALLOWED_ORIGINS_VALUE')}"]
 
@@ -202,6 +263,16 @@ AUTHENTICATION_BACKENDS = [
     "django.contrib.auth.backends.ModelBackend",
 ]
 AUTH_TOKEN_EXPIRY = 60 * 60 * 24  # 24 hours
+AUTH_TOKEN_CACHE_LOCAL_TTL = 5  # Seconds a process trusts its own copy
+AUTH_TOKEN_CACHE_LOCAL_SIZE = 1024  # Tokens kept in each process
+AUTH_VERIFICATION = {
+    # Processes recovering login signatures per web worker (0 = inline)
+    "POOL_SIZE": int(os.getenv("AUTH_VERIFICATION_POOL_SIZE", "2")),
+    # Recoveries queued or running before new logins are turned away
+    "MAX_QUEUE_DEPTH": int(os.getenv("AUTH_VERIFICATION_MAX_QUEUE_DEPTH", "64")),
+    # Seconds a login waits for its recovery
+    "TIMEOUT": float(os.getenv("AUTH_VERIFICATION_TIMEOUT", "5")),
+}
 
 # Redis and Celery Configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -211,6 +282,33 @@ CELERY_ACCEPT_CONTENT = ["application/json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 
+# Cache Configuration
+CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": REDIS_URL,
+        "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
+    }
+}
+WEATHER_SNAPSHOT_TTL = 60 * 30  # 30 minutes, the growth cycle's freshness window
+WEATHER_SNAPSHOT_LOCAL_TTL = 5  # Seconds between shared version checks
+GARDEN_RESPONSE_CACHE_TTL = 60 * 60  # Rendered garden responses, per version
+PLANT_CATALOG_LOCAL_TTL = 5  # Seconds between plant catalog version checks
+GARDEN_EVENTS = {
+    # Serve garden event streams. Only enable under the ASGI app: a WSGI
+    # worker is tied up by every open stream
+    "ENABLED": os.getenv("GARDEN_EVENTS_ENABLED", "false").lower() == "true",
+    # Redis pub/sub channel announcing garden and weather changes
+    "CHANNEL": "garden:events",
+    # Seconds between keep-alive comments on idle event streams
+    "HEARTBEAT_SECONDS": 15,
+    # Seconds before resubscribing after losing Redis, doubling up to the max
+    "RECONNECT_SECONDS": 1,
+    "MAX_RECONNECT_SECONDS": 30,
+    # Seconds a stream ticket can be redeemed for after it is issued
+    "TICKET_TTL": 30,
+}
+
 # Security Settings
 SECURE_SSL_REDIRECT = not DEBUG
 SESSION_COOKIE_SECURE = not DEBUG
@@ -1,5 +1,7 @@
 from nanoid import generate
 from secrets import token_hex
+from django.conf import settings
+from django.utils import timezone
 
 
 def generate_id():
@@ -10,3 +12,9 @@ def generate_id():
 def generate_hex_token():
     """Returns a string to be used as an authentication token"""
     return token_hex(32)
+
+
+def get_growth_tick(moment=None):
+    """Returns the number of the growth tick a moment (default: now) falls in"""
+    moment = moment or timezone.now()
+    return int(moment.timestamp() // settings.GARDEN["GROWTH_TICK_SECONDS"])
@@ -1,5 +1,11 @@
 from django.contrib.admin import register, ModelAdmin
-from .models import BlockchainMetrics, WeatherState
+from .models import (
+    BlockchainMetrics,
+    WeatherState,
+    BlockCursor,
+    MetricsRollup,
+    WeatherRollup,
+)
 
 
 @register(BlockchainMetrics)
@@ -36,4 +42,38 @@ class WeatherStateAdmin(ModelAdmin):
         "rainfall",
         "sunlight",
     ]
-    readonly_fields = ["timestamp"]
\ No newline at end of file
+    readonly_fields = ["timestamp"]
+
+
+@register(BlockCursor)
+class BlockCursorAdmin(ModelAdmin):
+    list_display = ["name", "block_number", "updated"]
+    readonly_fields = ["updated"]
+
+
+@register(MetricsRollup)
+class MetricsRollupAdmin(ModelAdmin):
+    list_display = [
+        "bucket",
+        "resolution",
+        "samples",
+        "transaction_count",
+        "average_gas_price",
+        "block_number",
+        "network_load",
+    ]
+    list_filter = ["resolution", "bucket"]
+
+
+@register(WeatherRollup)
+class WeatherRollupAdmin(ModelAdmin):
+    list_display = [
+        "bucket",
+        "resolution",
+        "samples",
+        "weather_type",
+        "temperature",
+        "rainfall",
+        "sunlight",
+    ]
+    list_filter = ["resolution", "weather_type", "bucket"]
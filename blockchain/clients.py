@@ -0,0 +1,187 @@
+"""
+Pooled HTTP clients for the RPC node and the block explorer.
+Each worker process builds them once, so every task reuses keep-alive
+connections instead of paying for new TCP and TLS handshakes.
+"""
+
+from celery.signals import worker_process_init
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+import aiohttp
+import asyncio
+import requests
+import threading
+
+
+class ClientRegistry:
+    """Per-process registry of pooled RPC and explorer clients"""
+
+    _lock = threading.Lock()
+    _loop_lock = threading.Lock()
+    w3 = None
+    rpc_session = None
+    explorer_session = None
+    # The async explorer session is tied to the event loop it was opened
+    # on, so each process keeps one loop to run its monitoring runs on
+    loop = None
+    explorer_async_session = None
+    explorer_async_stats = {"requests": 0, "connections": 0, "reused": 0}
+
+    @staticmethod
+    def _build_session():
+        """Creates a keep-alive session with a bounded connection pool"""
+        pool_size = settings.BLOCKCHAIN_MONITOR["POOL_SIZE"]
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @classmethod
+    def _build_async_session(cls):
+        """
+        Creates a keep-alive aiohttp session on the running loop, counting
+        its requests and connections for get_stats.
+        """
+        config = settings.BLOCKCHAIN_MONITOR
+        stats = cls.explorer_async_stats
+
+        async def on_request_start(session, context, params):
+            stats["requests"] += 1
+
+        async def on_connection_create_end(session, context, params):
+            stats["connections"] += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            stats["reused"] += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=config["REQUEST_TIMEOUT"]),
+            # Matches the number of explorer requests a run keeps in flight
+            connector=aiohttp.TCPConnector(limit=config["CONCURRENCY"]),
+            trace_configs=[trace_config],
+        )
+
+    @classmethod
+    def initialize(cls):
+        """(Re)builds the clients for the current process"""
+        with cls._lock:
+            for session in (cls.rpc_session, cls.explorer_session):
+                if session is not None:
+                    session.close()
+            with cls._loop_lock:
+                if cls.loop is not None and not cls.loop.is_closed():
+                    if cls.explorer_async_session is not None:
+                        cls.loop.run_until_complete(cls.explorer_async_session.close())
+                    cls.loop.close()
+                # The async session opens on the new loop on first use
+                cls.loop = asyncio.new_event_loop()
+                cls.explorer_async_session = None
+                cls.explorer_async_stats = {
+                    "requests": 0,
+                    "connections": 0,
+                    "reused": 0,
+                }
+            cls.rpc_session = cls._build_session()
+            cls.explorer_session = cls._build_session()
+            cls.w3 = Web3(
+                Web3.HTTPProvider(
+                    settings.ABSTRACT["RPC_URL"],
+                    request_kwargs={
+                        "timeout": settings.BLOCKCHAIN_MONITOR["REQUEST_TIMEOUT"]
+                    },
+                    session=cls.rpc_session,
+                )
+            )
+
+    @classmethod
+    def get(cls):
+        """Returns the registry, building the clients on first use"""
+        if cls.w3 is None:
+            cls.initialize()
+        return cls
+
+    @classmethod
+    def run_async(cls, coroutine):
+        """
+        Runs a coroutine to completion on this process's event loop, where
+        the pooled async explorer session lives.
+        """
+        cls.get()
+        with cls._loop_lock:
+            return cls.loop.run_until_complete(coroutine)
+
+    @classmethod
+    def get_explorer_async_session(cls):
+        """
+        Returns the pooled async explorer session, opening it on first use.
+        Call from a coroutine run through run_async.
+        """
+        if cls.explorer_async_session is None or cls.explorer_async_session.closed:
+            cls.explorer_async_session = cls._build_async_session()
+        return cls.explorer_async_session
+
+    @classmethod
+    def rpc_batch(cls, calls):
+        """
+        Sends several (method, params) JSON-RPC calls to the node in a single
+        HTTP request over the pooled RPC session.
+        Returns their results in call order.
+        """
+        cls.get()
+        payload = [
+            {"jsonrpc": "2.0", "id": index, "method": method, "params": params}
+            for index, (method, params) in enumerate(calls)
+        ]
+        response = cls.rpc_session.post(
+            settings.ABSTRACT["RPC_URL"],
+            json=payload,
+            timeout=settings.BLOCKCHAIN_MONITOR["REQUEST_TIMEOUT"],
+        )
+        response.raise_for_status()
+        replies = {reply.get("id"): reply for reply in response.json()}
+        results = []
+        for index, (method, _) in enumerate(calls):
+            reply = replies.get(index)
+            if reply is None or "error" in reply:
+                error = reply.get("error") if reply else "no reply"
+                raise Exception(f"RPC call {method} failed: {error}")
+            results.append(reply["result"])
+        return results
+
+    @staticmethod
+    def _get_session_stats(session):
+        """Sums request and connection counters over a session's pools"""
+        stats = {"requests": 0, "connections": 0, "reused": 0}
+        if session is None:
+            return stats
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                stats["requests"] += pool.num_requests
+                stats["connections"] += pool.num_connections
+        stats["reused"] = max(0, stats["requests"] - stats["connections"])
+        return stats
+
+    @classmethod
+    def get_stats(cls):
+        """Connection reuse counters for this process's clients"""
+        return {
+            "rpc": cls._get_session_stats(cls.rpc_session),
+            "explorer": cls._get_session_stats(cls.explorer_session),
+            "explorer_async": dict(cls.explorer_async_stats),
+        }
+
+
+@worker_process_init.connect
+def initialize_clients(**kwargs):
+    """Builds fresh clients in every forked worker process"""
+    ClientRegistry.initialize()
@@ -9,8 +9,16 @@ from django.db.models import (
     PositiveIntegerField,
     FloatField,
     DateTimeField,
+    PositiveBigIntegerField,
+    UniqueConstraint,
 )
 
+ROLLUP_RESOLUTIONS = [
+    ("minute", "Minute"),
+    ("hour", "Hour"),
+    ("day", "Day"),
+]
+
 
 class BlockchainMetrics(Model):
     timestamp = DateTimeField(auto_now_add=True, db_index=True)
@@ -32,7 +40,7 @@ class WeatherState(Model):
         ("rainy", "Rainy"),
         ("stormy", "Stormy"),
     ]
-    timestamp = DateTimeField(auto_now_add=True)
+    timestamp = DateTimeField(auto_now_add=True, db_index=True)
     weather_type = CharField(max_length=10, choices=WEATHER_TYPES, db_index=True)
     temperature = FloatField()  # Determined by network congestion
     rainfall = FloatField()  # Determined by transaction volume
@@ -40,3 +48,56 @@ class WeatherState(Model):
 
     class Meta:
         ordering = ["-timestamp"]
+
+
+class MetricsRollup(Model):
+    """BlockchainMetrics samples averaged over a minute, hour or day"""
+
+    resolution = CharField(max_length=10, choices=ROLLUP_RESOLUTIONS)
+    bucket = DateTimeField()  # Start of the period
+    samples = PositiveIntegerField()  # Raw samples the averages cover
+    transaction_count = FloatField()
+    average_gas_price = FloatField()
+    block_number = PositiveBigIntegerField()  # Newest block in the period
+    network_load = FloatField()
+
+    class Meta:
+        ordering = ["-bucket"]
+        constraints = [
+            UniqueConstraint(
+                fields=["resolution", "bucket"], name="unique_metrics_rollup"
+            )
+        ]
+
+
+class WeatherRollup(Model):
+    """WeatherState samples averaged over a minute, hour or day"""
+
+    resolution = CharField(max_length=10, choices=ROLLUP_RESOLUTIONS)
+    bucket = DateTimeField()  # Start of the period
+    samples = PositiveIntegerField()  # Raw samples the averages cover
+    weather_type = CharField(
+        max_length=10, choices=WeatherState.WEATHER_TYPES
+    )  # Most frequent weather in the period
+    temperature = FloatField()
+    rainfall = FloatField()
+    sunlight = FloatField()
+
+    class Meta:
+        ordering = ["-bucket"]
+        constraints = [
+            UniqueConstraint(
+                fields=["resolution", "bucket"], name="unique_weather_rollup"
+            )
+        ]
+
+
+class BlockCursor(Model):
+    """Last block a block-scanning ingestion has fully processed"""
+
+    name = CharField(max_length=50, unique=True)
+    block_number = PositiveBigIntegerField()
+    updated = DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} at block {self.block_number}"
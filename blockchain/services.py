@@ -1,58 +1,509 @@
-from web3 import Web3
 from django.conf import settings
-from .models import BlockchainMetrics, WeatherState
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from .models import (
+    BlockchainMetrics,
+    WeatherState,
+    BlockCursor,
+    MetricsRollup,
+    WeatherRollup,
+)
+from .clients import ClientRegistry
 from django.utils import timezone
+from django.db.models import F, FloatField, Max, Sum, Value
+from django.db.models.functions import Trunc
+from django.db.transaction import atomic
+from datetime import timedelta
+from collections import defaultdict, deque
+import aiohttp
+import asyncio
+import json
 import requests
+import time
+
+
+class WeatherSnapshot:
+    """
+    Newest weather state, cached in process memory and in a shared Redis key.
+    BlockchainMonitor._update_weather writes every new state through, bumping
+    a version number; readers keep a local copy and only compare versions
+    with Redis every WEATHER_SNAPSHOT_LOCAL_TTL seconds.
+    """
+
+    CACHE_KEY = "weather:snapshot"
+    VERSION_KEY = "weather:snapshot:version"
+    _local = None  # (version, weather)
+    _checked_at = 0.0
+
+    @classmethod
+    def publish(cls, weather):
+        """Writes a new weather state through to Redis and this process"""
+        cache.add(cls.VERSION_KEY, 0, timeout=None)
+        version = cache.incr(cls.VERSION_KEY)
+        cache.set(cls.CACHE_KEY, (version, weather), settings.WEATHER_SNAPSHOT_TTL)
+        cls._local = (version, weather)
+        cls._checked_at = time.monotonic()
+        # Let open garden event streams push the new weather
+        get_redis_connection("default").publish(
+            settings.GARDEN_EVENTS["CHANNEL"], json.dumps({"weather": version})
+        )
+        return version
+
+    @classmethod
+    def get_version(cls):
+        """Returns the version of the newest weather state"""
+        cls.get()
+        return cls._local[0] if cls._local else None
+
+    @classmethod
+    def get(cls):
+        """Returns the newest weather state, or None if none was recorded"""
+        now = time.monotonic()
+        if cls._local and now - cls._checked_at < settings.WEATHER_SNAPSHOT_LOCAL_TTL:
+            return cls._local[1]
+        version = cache.get(cls.VERSION_KEY)
+        if cls._local and version == cls._local[0]:
+            cls._checked_at = now
+            return cls._local[1]
+        snapshot = cache.get(cls.CACHE_KEY)
+        if snapshot is None:
+            # Shared entry expired or was never written
+            weather = WeatherState.objects.first()
+            if weather is None:
+                return None
+            cls.publish(weather)
+            return weather
+        cls._local = snapshot
+        cls._checked_at = now
+        return snapshot[1]
+
+
+class NetworkWindow:
+    """
+    Rolling window over the last METRICS_WINDOW blocks, kept in the shared
+    cache between runs. Blocks are fed in one at a time and running totals
+    keep every update O(1), so each run only fetches blocks it has not seen.
+    """
+
+    CACHE_KEY = "network:window"
+
+    def __init__(self, size):
+        self.size = size
+        self.samples = deque(maxlen=size)  # (block, tx count, base fee, utilization)
+        self.transaction_total = 0
+        self.utilization_total = 0.0
+
+    @classmethod
+    def load(cls):
+        """Returns the shared window, or a new one if missing or resized"""
+        size = settings.BLOCKCHAIN_MONITOR["METRICS_WINDOW"]
+        window = cache.get(cls.CACHE_KEY)
+        if window is None or window.size != size:
+            window = cls(size)
+        return window
+
+    def save(self):
+        cache.set(self.CACHE_KEY, self, timeout=None)
+
+    @property
+    def head(self):
+        """Newest block in the window"""
+        return self.samples[-1][0] if self.samples else None
+
+    def get_missing_blocks(self, latest_block):
+        """Blocks up to latest_block the window still needs"""
+        first_block = latest_block - self.size + 1
+        if self.head is not None:
+            first_block = max(first_block, self.head + 1)
+        return list(range(max(first_block, 0), latest_block + 1))
+
+    def push(self, block_number, transaction_count, base_fee, utilization):
+        """Adds a block, evicting the oldest one once the window is full"""
+        if self.head is not None and block_number <= self.head:
+            return
+        if len(self.samples) == self.size:
+            _, evicted_transactions, _, evicted_utilization = self.samples[0]
+            self.transaction_total -= evicted_transactions
+            self.utilization_total -= evicted_utilization
+        self.samples.append((block_number, transaction_count, base_fee, utilization))
+        self.transaction_total += transaction_count
+        self.utilization_total += utilization
+
+    def get_transaction_count(self):
+        """Average transactions per block"""
+        return self.transaction_total / len(self.samples) if self.samples else 0
+
+    def get_utilization(self):
+        """Average share of the block gas limit used"""
+        return self.utilization_total / len(self.samples) if self.samples else 0.0
+
+    def get_base_fee_percentile(self, percentile):
+        """
+        Nearest-rank base fee percentile over the window's blocks that
+        report one, or None if none do.
+        """
+        base_fees = sorted(
+            sample[2] for sample in self.samples if sample[2] is not None
+        )
+        if not base_fees:
+            return None
+        rank = max(0, -(-percentile * len(base_fees) // 100) - 1)
+        return base_fees[rank]
+
+
+class WalletIndex:
+    """
+    In-memory map of active garden owners' wallet addresses to their garden.
+    Refreshed incrementally from rows changed since the last refresh, with
+    a periodic full rebuild to drop deleted users.
+    """
+
+    _gardens = {}  # wallet address -> garden id
+    _refreshed_at = None
+    _rebuilt_at = 0.0
+
+    @classmethod
+    def refresh(cls):
+        """Brings the index up to date with the database"""
+        from garden.models import Garden
+        from django.db.models import Q
+
+        now = timezone.now()
+        gardens = Garden.objects.exclude(owner__wallet_address__isnull=True)
+        full_rebuild = (
+            cls._refreshed_at is None
+            or time.monotonic() - cls._rebuilt_at
+            > settings.BLOCKCHAIN_MONITOR["WALLET_INDEX_REFRESH"]
+        )
+        if full_rebuild:
+            index = {}
+        else:
+            index = dict(cls._gardens)
+            gardens = gardens.filter(
+                Q(created__gt=cls._refreshed_at)
+                | Q(owner__updated__gt=cls._refreshed_at)
+            )
+        for garden_id, wallet_address, is_active in gardens.values_list(
+            "id", "owner__wallet_address", "owner__is_active"
+        ):
+            if not wallet_address:
+                continue
+            if is_active:
+                index[wallet_address.lower()] = garden_id
+            else:
+                index.pop(wallet_address.lower(), None)
+        cls._gardens = index
+        cls._refreshed_at = now
+        if full_rebuild:
+            cls._rebuilt_at = time.monotonic()
+
+    @classmethod
+    def get_garden_id(cls, address):
+        """Returns the garden id owned by an address, if any"""
+        return cls._gardens.get(address.lower()) if address else None
+
+
+class TimeSeriesService:
+    """
+    Compacts the append-only BlockchainMetrics and WeatherState logs into
+    minute, hour and day rollups, and prunes rows past their retention.
+    Each resolution is built from the one below it, starting again from its
+    newest bucket, which may still have been filling up on the last run.
+    Rows are only pruned once the next resolution covers them.
+    """
+
+    RESOLUTIONS = ["minute", "hour", "day"]
+    METRICS_FIELDS = ["transaction_count", "average_gas_price", "network_load"]
+    WEATHER_FIELDS = ["temperature", "rainfall", "sunlight"]
+
+    @classmethod
+    def _get_source(cls, raw_model, rollup_model, resolution):
+        """
+        Returns the rows a resolution is built from, with their time field
+        and the number of samples each row stands for.
+        """
+        index = cls.RESOLUTIONS.index(resolution)
+        if index == 0:
+            return raw_model.objects.all(), "timestamp", Value(1)
+        return (
+            rollup_model.objects.filter(resolution=cls.RESOLUTIONS[index - 1]),
+            "bucket",
+            F("samples"),
+        )
+
+    @staticmethod
+    def _get_latest_bucket(rollup_model, resolution):
+        """Returns the start of the newest bucket at a resolution"""
+        return (
+            rollup_model.objects.filter(resolution=resolution)
+            .order_by("-bucket")
+            .values_list("bucket", flat=True)
+            .first()
+        )
+
+    @classmethod
+    def _aggregate(cls, raw_model, rollup_model, resolution, fields, **extra):
+        """Sums the sample-weighted fields of every bucket still to be rolled up"""
+        source, time_field, weight = cls._get_source(
+            raw_model, rollup_model, resolution
+        )
+        latest_bucket = cls._get_latest_bucket(rollup_model, resolution)
+        if latest_bucket is not None:
+            source = source.filter(**{f"{time_field}__gte": latest_bucket})
+        source = source.annotate(period=Trunc(time_field, resolution))
+        rows = (
+            source.order_by()
+            .values("period")
+            .annotate(
+                total=Sum(weight),
+                **{
+                    field: Sum(F(field) * weight, output_field=FloatField())
+                    for field in fields
+                },
+                **extra,
+            )
+            .order_by("period")
+        )
+        return source, weight, list(rows)
+
+    @staticmethod
+    def _upsert(rollup_model, rollups, update_fields):
+        """Inserts new buckets and overwrites the ones being refilled"""
+        if rollups:
+            rollup_model.objects.bulk_create(
+                rollups,
+                update_conflicts=True,
+                unique_fields=["resolution", "bucket"],
+                update_fields=update_fields,
+            )
+        return len(rollups)
+
+    @classmethod
+    def _rollup_metrics(cls, resolution):
+        """Builds the BlockchainMetrics rollups of one resolution"""
+        _, _, rows = cls._aggregate(
+            BlockchainMetrics,
+            MetricsRollup,
+            resolution,
+            cls.METRICS_FIELDS,
+            newest_block=Max("block_number"),
+        )
+        rollups = [
+            MetricsRollup(
+                resolution=resolution,
+                bucket=row["period"],
+                samples=row["total"],
+                block_number=row["newest_block"],
+                **{field: row[field] / row["total"] for field in cls.METRICS_FIELDS},
+            )
+            for row in rows
+        ]
+        return cls._upsert(
+            MetricsRollup,
+            rollups,
+            ["samples", "block_number", *cls.METRICS_FIELDS],
+        )
+
+    @classmethod
+    def _rollup_weather(cls, resolution):
+        """Builds the WeatherState rollups of one resolution"""
+        source, weight, rows = cls._aggregate(
+            WeatherState, WeatherRollup, resolution, cls.WEATHER_FIELDS
+        )
+        if not rows:
+            return 0
+        # Each bucket keeps the weather type that covered most samples
+        dominant_types = {}
+        type_counts = (
+            source.order_by()
+            .values("period", "weather_type")
+            .annotate(count=Sum(weight))
+        )
+        for row in type_counts:
+            best = dominant_types.get(row["period"])
+            if best is None or row["count"] > best[1]:
+                dominant_types[row["period"]] = (row["weather_type"], row["count"])
+        rollups = [
+            WeatherRollup(
+                resolution=resolution,
+                bucket=row["period"],
+                samples=row["total"],
+                weather_type=dominant_types[row["period"]][0],
+                **{field: row[field] / row["total"] for field in cls.WEATHER_FIELDS},
+            )
+            for row in rows
+        ]
+        return cls._upsert(
+            WeatherRollup,
+            rollups,
+            ["samples", "weather_type", *cls.WEATHER_FIELDS],
+        )
+
+    @classmethod
+    def rollup(cls):
+        """Brings every resolution up to date, finest first"""
+        try:
+            stats = {}
+            for resolution in cls.RESOLUTIONS:
+                stats[f"metrics_{resolution}"] = cls._rollup_metrics(resolution)
+                stats[f"weather_{resolution}"] = cls._rollup_weather(resolution)
+            return stats
+        except Exception as e:
+            raise Exception(f"Failed to roll up time series: {str(e)}")
+
+    @classmethod
+    def prune(cls):
+        """Deletes raw rows and rollups older than their retention"""
+        try:
+            now = timezone.now()
+            retention = settings.TIME_SERIES
+            stats = {}
+            for raw_model, rollup_model, name in (
+                (BlockchainMetrics, MetricsRollup, "metrics"),
+                (WeatherState, WeatherRollup, "weather"),
+            ):
+                # Raw samples, then minute and hour rollups; day rollups stay
+                levels = [
+                    (
+                        raw_model.objects.all(),
+                        "timestamp",
+                        "minute",
+                        retention["RAW_RETENTION_DAYS"],
+                    ),
+                    (
+                        rollup_model.objects.filter(resolution="minute"),
+                        "bucket",
+                        "hour",
+                        retention["MINUTE_RETENTION_DAYS"],
+                    ),
+                    (
+                        rollup_model.objects.filter(resolution="hour"),
+                        "bucket",
+                        "day",
+                        retention["HOUR_RETENTION_DAYS"],
+                    ),
+                ]
+                for rows, time_field, covering_resolution, days in levels:
+                    covered_until = cls._get_latest_bucket(
+                        rollup_model, covering_resolution
+                    )
+                    if covered_until is None:
+                        continue
+                    cutoff = min(now - timedelta(days=days), covered_until)
+                    deleted, _ = rows.filter(
+                        **{f"{time_field}__lt": cutoff}
+                    ).delete()
+                    stats[f"{name}_{covering_resolution}_source"] = deleted
+            return stats
+        except Exception as e:
+            raise Exception(f"Failed to prune time series: {str(e)}")
 
 
 class BlockchainMonitor:
     def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider(settings.ABSTRACT["RPC_URL"]))
+        # Clients are pooled per process so connections outlive the monitor
+        clients = ClientRegistry.get()
+        self.w3 = clients.w3
+        self.session = clients.explorer_session
         self.last_processed_block = None
+        self.network_window = None
         self.explorer_api_url = settings.ABSTRACT["EXPLORER_API_URL"]
 
     def check_connection(self):
-        """Verifies connection to the blockchain."""
+        """
+        Verifies connection to the blockchain.
+        The latest block (with transaction hashes only) and the gas price are
+        fetched in one batched JSON-RPC request; a reply means the node is
+        reachable.
+        """
         try:
-            is_connected = self.w3.is_connected()
-            current_block = (
-                self.w3.eth.get_block("latest", True) if is_connected else None
+            latest_block, gas_price = ClientRegistry.rpc_batch(
+                [
+                    ("eth_getBlockByNumber", ["latest", False]),
+                    ("eth_gasPrice", []),
+                ]
             )
-            gas_price = self.w3.eth.gas_price if is_connected else None
             return {
                 "connected": True,
-                "current_block": current_block,
-                "gas_price": gas_price,
+                "current_block": self._parse_block(latest_block),
+                "gas_price": int(gas_price, 16),
             }
         except Exception as e:
             return {"connected": False, "error": str(e)}
 
+    @staticmethod
+    def _parse_block(block):
+        """Extracts the fields metrics use from a raw JSON-RPC block"""
+        return {
+            "number": int(block["number"], 16),
+            "transactions": block["transactions"],
+            "gas_used": int(block.get("gasUsed", "0x0"), 16),
+            "gas_limit": int(block.get("gasLimit", "0x0"), 16),
+            "base_fee": (
+                int(block["baseFeePerGas"], 16) if block.get("baseFeePerGas") else None
+            ),
+        }
+
+    def _update_network_window(self, current_block):
+        """
+        Feeds the blocks the rolling window has not seen yet, fetching any
+        missed since the last run in one batched request.
+        """
+        window = NetworkWindow.load()
+        missing_blocks = window.get_missing_blocks(current_block["number"])[:-1]
+        blocks = [
+            self._parse_block(block)
+            for block in (
+                ClientRegistry.rpc_batch(
+                    [
+                        ("eth_getBlockByNumber", [hex(block_number), False])
+                        for block_number in missing_blocks
+                    ]
+                )
+                if missing_blocks
+                else []
+            )
+        ]
+        for block in [*blocks, current_block]:
+            window.push(
+                block["number"],
+                len(block["transactions"]),
+                # Every block is priced by the same measure, its header's
+                # base fee, however it entered the window
+                block["base_fee"],
+                block["gas_used"] / block["gas_limit"] if block["gas_limit"] else 0.0,
+            )
+        window.save()
+        return window
+
     def get_current_metrics(self):
-        """Collects current blockchain metrics."""
+        """
+        Collects current blockchain metrics.
+        Values are averaged over the rolling block window so weather does not
+        jump with every single block.
+        """
         try:
             connection_status = self.check_connection()
             if not connection_status["connected"]:
                 return None
             current_block = connection_status["current_block"]
-            gas_price = connection_status["gas_price"]
-            metrics, created = BlockchainMetrics.objects.get_or_create(
-                defaults={
-                    "transaction_count": len(current_block["transactions"]),
-                    "average_gas_price": gas_price,
-                    "block_number": current_block["number"],
-                    "network_load": min(len(current_block["transactions"]) / 100, 1.0),
-                }
-            )
-            if not created:
-                # Update existing record
-                metrics.transaction_count = len(current_block["transactions"])
-                metrics.average_gas_price = gas_price
-                metrics.block_number = current_block["number"]
-                metrics.network_load = min(
-                    len(current_block["transactions"]) / 100, 1.0
-                )
-                metrics.timestamp = timezone.now()
-                metrics.save()
+            window = self._update_network_window(current_block)
+            self.network_window = window
+            transaction_count = round(window.get_transaction_count())
+            # average_gas_price stores the median base fee over the window;
+            # the node's eth_gasPrice is only used when no block reports one
+            gas_price = window.get_base_fee_percentile(50)
+            if gas_price is None:
+                gas_price = connection_status["gas_price"]
+            network_load = min(window.get_transaction_count() / 100, 1.0)
+            # Metrics are appended as a time series; TimeSeriesService rolls
+            # them up and prunes old samples
+            metrics = BlockchainMetrics.objects.create(
+                transaction_count=transaction_count,
+                average_gas_price=gas_price,
+                block_number=current_block["number"],
+                network_load=network_load,
+            )
             self._update_weather(metrics)
             return metrics
         except Exception as e:
@@ -78,83 +529,274 @@ class BlockchainMonitor:
                 weather_type = "sunny"
                 # Sunny weather can be quite warm
                 temperature = 25 + (metrics.network_load * 20)
-            weather, created = WeatherState.objects.get_or_create(
-                defaults={
-                    "weather_type": weather_type,
-                    "temperature": temperature,  # 20-40 degrees
-                    "rainfall": metrics.transaction_count / 100,
-                    "sunlight": 100 - (metrics.network_load * 100),
-                }
-            )
-            if not created:
-                # Update existing record
-                weather.weather_type = weather_type
-                weather.temperature = 20 + (metrics.network_load * 20)
-                weather.rainfall = metrics.transaction_count / 100
-                weather.sunlight = 100 - (metrics.network_load * 100)
-                weather.timestamp = timezone.now()
-                weather.save()
+            # Weather is kept as an append-only timeline so growth can be
+            # replayed for any past tick
+            weather = WeatherState.objects.create(
+                weather_type=weather_type,
+                temperature=temperature,  # 20-40 degrees
+                rainfall=metrics.transaction_count / 100,
+                sunlight=100 - (metrics.network_load * 100),
+            )
+            WeatherSnapshot.publish(weather)
         except Exception as e:
             raise Exception(f"Failed to update weather: {str(e)}")
 
+    @staticmethod
+    def _build_activity_params(garden, page=1):
+        """
+        Explorer query for a garden owner's transactions past the garden's
+        cursor, oldest first. The cursor block itself is requested again so
+        later transactions in that block are not missed. Gardens without a
+        cursor yet only look at their most recent transactions.
+        """
+        params = {
+            "module": "account",
+            "action": "txlist",
+            "address": garden.owner.wallet_address,
+            "endblock": 99999999,
+        }
+        if garden.last_processed_block is None:
+            params.update(page=1, offset=10, sort="desc", startblock=0)
+        else:
+            params.update(
+                page=page,
+                offset=settings.BLOCKCHAIN_MONITOR["EXPLORER_PAGE_SIZE"],
+                sort="asc",
+                startblock=garden.last_processed_block,
+            )
+        return params
+
+    @staticmethod
+    def _has_next_page(garden, params, transactions):
+        """Whether a cursor fetch should continue with the following page"""
+        return (
+            garden.last_processed_block is not None
+            and len(transactions) >= params["offset"]
+            and params["page"] < settings.BLOCKCHAIN_MONITOR["EXPLORER_MAX_PAGES"]
+        )
+
+    @staticmethod
+    def _parse_activities(garden, transactions, cutoff_time):
+        """
+        Extracts garden activities from transactions past the garden's cursor.
+        Returns the activities and the newest (block number, transaction
+        index) position seen, which becomes the garden's new cursor.
+        """
+        cursor = None
+        if garden.last_processed_block is not None:
+            cursor = (garden.last_processed_block, garden.last_processed_tx_index)
+        newest_position = cursor
+        activities = []
+        for tx in transactions:
+            try:
+                position = (int(tx["blockNumber"]), int(tx["transactionIndex"]))
+                if cursor and position <= cursor:
+                    continue
+                if newest_position is None or position > newest_position:
+                    newest_position = position
+                timestamp = int(tx["timeStamp"])
+                if timestamp < cutoff_time:
+                    continue
+                if tx.get("isError") == "1":
+                    continue
+                # Check value and method ID
+                if int(tx.get("value", "0")) > 0:
+                    activities.append("transfer")
+                # method_id = tx.get("methodId", "").lower()
+                # if method_id == "0x38ed1739":  # swap
+                #     activities.append("swap")
+                # elif method_id == "0xa694fc3a":  # stake
+                #     activities.append("stake")
+            except Exception as tx_error:
+                continue
+        return activities, newest_position
+
+    @staticmethod
+    def _advance_cursor(garden, position):
+        """Moves a garden's cursor, returning whether it changed"""
+        if position is None or position == (
+            garden.last_processed_block,
+            garden.last_processed_tx_index,
+        ):
+            return False
+        garden.last_processed_block, garden.last_processed_tx_index = position
+        return True
+
+    def _get_activity_cutoff(self):
+        """Only transactions from the last 5 minutes of chain time count"""
+        current_block = self.w3.eth.get_block("latest")
+        return current_block["timestamp"] - (5 * 60)
+
     def monitor_user_activity(self, user_address):
         """Monitor specific user's blockchain activity"""
         try:
-            # Get user's garden and last processed transaction
+            # Get user's garden and its transaction cursor
             from garden.models import Garden
-            garden = Garden.objects.filter(owner__wallet_address=user_address).first()
+            garden = (
+                Garden.objects.select_related("owner")
+                .filter(owner__wallet_address=user_address)
+                .first()
+            )
             if not garden:
                 return []
-            params = {
-                "module": "account",
-                "action": "txlist",
-                "page": 1,
-                "offset": 10,
-                "sort": "desc",
-                "address": user_address,
-                "startblock": 0,
-                "endblock": 99999999,
-            }
-            response = requests.get(self.explorer_api_url, params=params, timeout=50)
-            if not response.ok:
-                return []
-            data = response.json()
-            if data.get("status") != "1":
-                return []
-            transactions = data.get("result", [])
-            activities = []
-            # Get current block timestamp
-            current_block = self.w3.eth.get_block("latest")
-            current_timestamp = current_block["timestamp"]
-            cutoff_time = current_timestamp - (5 * 60)  # 5 minutes ago
-            newest_hash = None
-            for tx in transactions:
-                if newest_hash is None:
-                    newest_hash = tx['hash']
-                if garden.last_processed_hash and tx['hash'] <= garden.last_processed_hash:
+            transactions = []
+            page = 1
+            while True:
+                params = self._build_activity_params(garden, page)
+                response = self.session.get(
+                    self.explorer_api_url,
+                    params=params,
+                    timeout=settings.BLOCKCHAIN_MONITOR["REQUEST_TIMEOUT"],
+                )
+                if not response.ok:
                     break
-                try:
-                    timestamp = int(tx["timeStamp"])
-                    if timestamp < cutoff_time:
-                        continue
-                    if tx.get("isError") == "1":
-                        continue
-                    # Check value and method ID
-                    if int(tx.get("value", "0")) > 0:
-                        activities.append("transfer")
-                    # method_id = tx.get("methodId", "").lower()
-                    # if method_id == "0x38ed1739":  # swap
-                    #     activities.append("swap")
-                    # elif method_id == "0xa694fc3a":  # stake
-                    #     activities.append("stake")
-                except Exception as tx_error:
-                    continue
-            # Update the last processed hash to the newest transaction we've seen
-            if newest_hash and newest_hash != garden.last_processed_hash:
-                garden.last_processed_hash = newest_hash
-                garden.save()
+                data = response.json()
+                if data.get("status") != "1":
+                    break
+                result = data.get("result", [])
+                transactions.extend(result)
+                if not self._has_next_page(garden, params, result):
+                    break
+                page += 1
+            activities, newest_position = self._parse_activities(
+                garden, transactions, self._get_activity_cutoff()
+            )
+            # Move the cursor to the newest transaction we've seen
+            if self._advance_cursor(garden, newest_position):
+                garden.save(
+                    update_fields=["last_processed_block", "last_processed_tx_index"]
+                )
             return activities
         except requests.Timeout:
             raise
         except Exception as e:
             raise Exception(f"Failed to monitor user activity: {str(e)}")
+
+    async def _fetch_transactions(self, session, semaphore, garden):
+        """
+        Fetches a garden owner's transactions past its cursor, page by page.
+        Returns None if the first request failed.
+        """
+        transactions = []
+        page = 1
+        async with semaphore:
+            while True:
+                params = self._build_activity_params(garden, page)
+                try:
+                    async with session.get(
+                        self.explorer_api_url, params=params
+                    ) as response:
+                        if not response.ok:
+                            break
+                        data = await response.json(content_type=None)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    break
+                if data.get("status") != "1":
+                    return transactions
+                result = data.get("result", [])
+                transactions.extend(result)
+                if not self._has_next_page(garden, params, result):
+                    return transactions
+                page += 1
+        # Pages fetched before a failure are still in order and usable
+        return transactions if page > 1 else None
+
+    async def _fetch_all_transactions(self, gardens):
+        """
+        Fetches every garden owner's transactions concurrently over the
+        process's pooled async explorer session.
+        """
+        semaphore = asyncio.Semaphore(settings.BLOCKCHAIN_MONITOR["CONCURRENCY"])
+        session = ClientRegistry.get_explorer_async_session()
+        return await asyncio.gather(
+            *(
+                self._fetch_transactions(session, semaphore, garden)
+                for garden in gardens
+            )
+        )
+
+    def monitor_user_activities(self, gardens):
+        """
+        Monitors the blockchain activity of many gardens' owners at once.
+        Explorer requests run concurrently, bounded by the configured
+        concurrency, so a run takes about as long as its slowest request.
+        The latest block is fetched once for the whole run and garden
+        cursors are saved in batches. Returns (garden, activities) pairs.
+        """
+        try:
+            from garden.models import Garden
+
+            cutoff_time = self._get_activity_cutoff()
+            results = ClientRegistry.run_async(self._fetch_all_transactions(gardens))
+            garden_activities = []
+            updated_gardens = []
+            for garden, transactions in zip(gardens, results):
+                if not transactions:
+                    continue
+                activities, newest_position = self._parse_activities(
+                    garden, transactions, cutoff_time
+                )
+                if self._advance_cursor(garden, newest_position):
+                    updated_gardens.append(garden)
+                if activities:
+                    garden_activities.append((garden, activities))
+            Garden.objects.bulk_update(
+                updated_gardens,
+                ["last_processed_block", "last_processed_tx_index"],
+                batch_size=settings.BLOCKCHAIN_MONITOR["BATCH_SIZE"],
+            )
+            return garden_activities
+        except Exception as e:
+            raise Exception(f"Failed to monitor user activities: {str(e)}")
+
+    def scan_new_blocks(self):
+        """
+        Scans every block since the persisted cursor once, matching
+        transaction senders and recipients against the wallet index, so the
+        cost follows the number of blocks rather than the number of users.
+        Blocks are fetched before the cursor is locked, and the cursor is
+        only advanced if no other scan moved it meanwhile, so the lock is
+        never held across RPC calls. Returns (garden id, activities) pairs.
+        """
+        try:
+            WalletIndex.refresh()
+            latest_block = self.w3.eth.block_number
+            cursor, created = BlockCursor.objects.get_or_create(
+                name="activity_ingestion", defaults={"block_number": latest_block}
+            )
+            first_block = cursor.block_number
+            last_block = min(
+                latest_block,
+                first_block + settings.BLOCKCHAIN_MONITOR["MAX_BLOCKS_PER_RUN"],
+            )
+            garden_activities = defaultdict(list)
+            for block_number in range(first_block + 1, last_block + 1):
+                block = self.w3.eth.get_block(block_number, True)
+                for tx in block["transactions"]:
+                    if int(tx.get("value", 0)) <= 0:
+                        continue
+                    # A transfer to oneself is still one activity
+                    garden_ids = {
+                        WalletIndex.get_garden_id(address)
+                        for address in (tx.get("from"), tx.get("to"))
+                    } - {None}
+                    if not garden_ids:
+                        continue
+                    # Blocks include reverted transactions
+                    receipt = self.w3.eth.get_transaction_receipt(tx["hash"])
+                    if receipt["status"] != 1:
+                        continue
+                    for garden_id in garden_ids:
+                        garden_activities[garden_id].append("transfer")
+            with atomic():
+                cursor = BlockCursor.objects.select_for_update().get(id=cursor.id)
+                if cursor.block_number != first_block:
+                    # A concurrent scan already applied these blocks
+                    self.last_processed_block = cursor.block_number
+                    return []
+                cursor.block_number = last_block
+                cursor.save()
+            self.last_processed_block = last_block
+            return list(garden_activities.items())
+        except Exception as e:
+            raise Exception(f"Failed to scan new blocks: {str(e)}")
@@ -1,6 +1,8 @@
 from celery import shared_task
-from .services import BlockchainMonitor
-from user.models import User
+from django.conf import settings
+from .services import BlockchainMonitor, TimeSeriesService
+from .clients import ClientRegistry
+from garden.models import Garden
 from garden.services import GrowthService
 
 
@@ -16,6 +18,10 @@ def update_blockchain_metrics():
                 "block_number": metrics.block_number,
                 "transaction_count": metrics.transaction_count,
                 "network_load": metrics.network_load,
+                "window_blocks": len(monitor.network_window.samples),
+                "utilization": monitor.network_window.get_utilization(),
+                "base_fee_p90": monitor.network_window.get_base_fee_percentile(90),
+                "connection_stats": ClientRegistry.get_stats(),
             }
         return {"status": "error", "message": "No metrics collected"}
     except Exception as e:
@@ -29,20 +35,45 @@ def monitor_user_activities():
     try:
         monitor = BlockchainMonitor()
         activity_count = 0
-        for user in User.objects.filter(is_active=True, garden__isnull=False):
-            if user.wallet_address:
-                print(f"Checking activities for wallet: {user.wallet_address}")
-                activities = monitor.monitor_user_activity(user.wallet_address)
-                # Process activities for user's garden
-                for activity in activities:
-                    print(f"Processing {activity} for {user.wallet_address}")
-                    GrowthService.process_user_activity(user.garden, activity)
-                    activity_count += 1
-                # Check for pest infestations
-                GrowthService.check_for_pests(user.garden)
+        gardens = list(
+            Garden.objects.select_related("owner")
+            .filter(owner__is_active=True, owner__wallet_address__isnull=False)
+            .exclude(owner__wallet_address="")
+        )
+        if settings.BLOCKCHAIN_MONITOR["ACTIVITY_SOURCE"] == "blocks":
+            gardens_by_id = {garden.id: garden for garden in gardens}
+            garden_activities = [
+                (gardens_by_id[garden_id], activities)
+                for garden_id, activities in monitor.scan_new_blocks()
+                if garden_id in gardens_by_id
+            ]
+        else:
+            print(f"Checking activities for {len(gardens)} wallets")
+            garden_activities = monitor.monitor_user_activities(gardens)
+        for garden, activities in garden_activities:
+            # Apply all of the poll's activities for the garden at once
+            print(
+                f"Processing {len(activities)} activities for "
+                f"{garden.owner.wallet_address}"
+            )
+            activity_count += GrowthService.process_user_activities(
+                garden, activities
+            )
         return {
             "status": "success",
             "message": f"Processed {activity_count} user activities",
+            "connection_stats": ClientRegistry.get_stats(),
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+
+@shared_task(max_retries=5)
+def compact_time_series():
+    """Roll up metrics and weather samples and prune expired rows"""
+    try:
+        rollups = TimeSeriesService.rollup()
+        pruned = TimeSeriesService.prune()
+        return {"status": "success", "rollups": rollups, "pruned": pruned}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
@@ -1,3 +1,609 @@
-from django.test import TestCase
+from contextlib import contextmanager
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.transaction import atomic
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+from garden.models import Garden
+from user.models import User
+from .clients import ClientRegistry
+from .models import (
+    BlockchainMetrics,
+    BlockCursor,
+    MetricsRollup,
+    WeatherRollup,
+    WeatherState,
+)
+from .services import (
+    BlockchainMonitor,
+    NetworkWindow,
+    TimeSeriesService,
+    WalletIndex,
+    WeatherSnapshot,
+)
+import json
+import threading
+import time
 
-# Create your tests here.
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+LATEST_BLOCK = 100
+GENESIS_TIME = 1_700_000_000
+
+
+def make_block(number):
+    """Raw JSON-RPC block whose base fee is ten times its number"""
+    return {
+        "number": hex(number),
+        "transactions": [f"0x{number:064x}"] * (number % 3),
+        "gasUsed": hex(15_000_000),
+        "gasLimit": hex(30_000_000),
+        "baseFeePerGas": hex(number * 10),
+        "timestamp": hex(GENESIS_TIME + number * 2),
+    }
+
+
+def make_transaction(block, index, value=1):
+    """Explorer txlist entry mined at the given position"""
+    return {
+        "blockNumber": str(block),
+        "transactionIndex": str(index),
+        "timeStamp": str(GENESIS_TIME + block * 2),
+        "value": str(value),
+        "isError": "0",
+    }
+
+
+class StubRPCHandler(BaseHTTPRequestHandler):
+    """
+    Answers JSON-RPC batches like a node, counting every POST, and txlist
+    queries like the block explorer, recording every GET's parameters.
+    """
+
+    # Keep-alive, so clients can reuse their pooled connections
+    protocol_version = "HTTP/1.1"
+    posts = []
+    gets = []
+    transactions = {}  # wallet address -> explorer transactions
+    failing = set()  # wallet addresses the explorer answers with a 500
+    delay = 0.0  # Seconds each explorer query takes
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+    mode = "ok"  # "ok", "missing" (drops a reply) or "error"
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        params = {key: values[0] for key, values in query.items()}
+        handler = type(self)
+        with handler.lock:
+            handler.gets.append(params)
+            handler.in_flight += 1
+            handler.max_in_flight = max(handler.max_in_flight, handler.in_flight)
+        try:
+            time.sleep(self.delay)
+        finally:
+            with handler.lock:
+                handler.in_flight -= 1
+        if params["address"] in self.failing:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        transactions = sorted(
+            (
+                tx
+                for tx in self.transactions.get(params["address"], [])
+                if int(tx["blockNumber"]) >= int(params["startblock"])
+            ),
+            key=lambda tx: (int(tx["blockNumber"]), int(tx["transactionIndex"])),
+            reverse=params["sort"] == "desc",
+        )
+        page, offset = int(params["page"]), int(params["offset"])
+        result = transactions[(page - 1) * offset : page * offset]
+        # The explorer reports an empty page as a failed query
+        self.send_json(
+            {"status": "1", "message": "OK", "result": result}
+            if result
+            else {"status": "0", "message": "No transactions found", "result": []}
+        )
+
+    def do_POST(self):
+        calls = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if isinstance(calls, dict):
+            # A single call from web3, answered like a one-call batch
+            type(self).posts.append([calls])
+            self.send_json(self.reply([calls])[0])
+            return
+        type(self).posts.append(calls)
+        self.send_json(self.reply(calls))
+
+    def reply(self, calls):
+        replies = []
+        for call in calls:
+            if call["method"] == "eth_gasPrice":
+                if self.mode == "missing":
+                    continue
+                result = hex(3_000_000_000)
+            else:
+                block = call["params"][0]
+                result = make_block(
+                    LATEST_BLOCK if block == "latest" else int(block, 16)
+                )
+            reply = {"jsonrpc": "2.0", "id": call["id"], "result": result}
+            if self.mode == "error":
+                reply = {
+                    "jsonrpc": "2.0",
+                    "id": call["id"],
+                    "error": {"code": -32000, "message": "header not found"},
+                }
+            replies.append(reply)
+        return replies
+
+    def send_json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@mock.patch("blockchain.services.get_redis_connection")
+class BlockchainMonitorRPCTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubRPCHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        host, port = self.server.server_address
+        overrides = override_settings(
+            CACHES=LOCMEM_CACHES,
+            ABSTRACT={
+                **settings.ABSTRACT,
+                "RPC_URL": f"http://{host}:{port}",
+                "EXPLORER_API_URL": f"http://{host}:{port}/api",
+            },
+            BLOCKCHAIN_MONITOR={**settings.BLOCKCHAIN_MONITOR, "METRICS_WINDOW": 4},
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        cache.clear()
+        ClientRegistry.initialize()
+        StubRPCHandler.posts = []
+        StubRPCHandler.gets = []
+        StubRPCHandler.transactions = {}
+        StubRPCHandler.failing = set()
+        StubRPCHandler.delay = 0.0
+        StubRPCHandler.max_in_flight = 0
+        StubRPCHandler.mode = "ok"
+        self.addCleanup(setattr, WeatherSnapshot, "_local", None)
+
+    def test_check_connection_is_one_request(self, get_redis_connection):
+        status = BlockchainMonitor().check_connection()
+        self.assertEqual(len(StubRPCHandler.posts), 1)
+        self.assertEqual(
+            [call["method"] for call in StubRPCHandler.posts[0]],
+            ["eth_getBlockByNumber", "eth_gasPrice"],
+        )
+        self.assertTrue(status["connected"])
+        self.assertEqual(status["current_block"]["number"], LATEST_BLOCK)
+        self.assertEqual(status["current_block"]["base_fee"], LATEST_BLOCK * 10)
+        self.assertEqual(status["gas_price"], 3_000_000_000)
+
+    def test_metrics_fetch_missed_blocks_in_one_batch(self, get_redis_connection):
+        metrics = BlockchainMonitor().get_current_metrics()
+        # Latest block and gas price, then the three missed window blocks
+        self.assertEqual(len(StubRPCHandler.posts), 2)
+        self.assertEqual(
+            [call["params"][0] for call in StubRPCHandler.posts[1]],
+            [hex(block) for block in range(97, 100)],
+        )
+        self.assertEqual(metrics.block_number, LATEST_BLOCK)
+        # Median base fee of blocks 97-100
+        self.assertEqual(metrics.average_gas_price, 980)
+        get_redis_connection.return_value.publish.assert_called_once()
+        # The window remembers its blocks, so the next run fetches none
+        BlockchainMonitor().get_current_metrics()
+        self.assertEqual(len(StubRPCHandler.posts), 3)
+        self.assertEqual(BlockchainMetrics.objects.count(), 2)
+
+    def test_missing_reply_fails_the_connection(self, get_redis_connection):
+        StubRPCHandler.mode = "missing"
+        status = BlockchainMonitor().check_connection()
+        self.assertFalse(status["connected"])
+        self.assertIn("RPC call eth_gasPrice failed: no reply", status["error"])
+        self.assertIsNone(BlockchainMonitor().get_current_metrics())
+
+    def test_error_reply_fails_the_connection(self, get_redis_connection):
+        StubRPCHandler.mode = "error"
+        status = BlockchainMonitor().check_connection()
+        self.assertFalse(status["connected"])
+        self.assertIn("RPC call eth_getBlockByNumber failed", status["error"])
+        self.assertIn("header not found", status["error"])
+        self.assertEqual(len(StubRPCHandler.posts), 1)
+
+    def create_gardens(self, count):
+        gardens = []
+        for index in range(count):
+            owner = User.objects.create_user(wallet_address=f"0x{index + 1:040x}")
+            StubRPCHandler.transactions[owner.wallet_address] = [
+                make_transaction(LATEST_BLOCK - 1, index)
+            ]
+            gardens.append(Garden.objects.create(owner=owner))
+        return gardens
+
+    def test_explorer_runs_share_pooled_connections(self, get_redis_connection):
+        with self.settings(
+            BLOCKCHAIN_MONITOR={**settings.BLOCKCHAIN_MONITOR, "CONCURRENCY": 2}
+        ):
+            gardens = self.create_gardens(3)
+            first = BlockchainMonitor().monitor_user_activities(gardens)
+            # The cursors moved past the only transactions
+            second = BlockchainMonitor().monitor_user_activities(gardens)
+        self.assertEqual(
+            [activities for _, activities in first], [["transfer"]] * 3
+        )
+        self.assertEqual(second, [])
+        self.assertEqual(len(StubRPCHandler.gets), 6)
+        # Both runs went through one session and at most two connections
+        stats = ClientRegistry.get_stats()["explorer_async"]
+        self.assertEqual(stats["requests"], 6)
+        self.assertLessEqual(stats["connections"], 2)
+        self.assertEqual(stats["reused"], 6 - stats["connections"])
+
+    def test_explorer_requests_run_concurrently_within_the_limit(
+        self, get_redis_connection
+    ):
+        StubRPCHandler.delay = 0.05
+        gardens = self.create_gardens(6)
+        with self.settings(
+            BLOCKCHAIN_MONITOR={**settings.BLOCKCHAIN_MONITOR, "CONCURRENCY": 3}
+        ):
+            results = BlockchainMonitor().monitor_user_activities(gardens)
+        self.assertEqual(len(results), 6)
+        self.assertEqual(StubRPCHandler.max_in_flight, 3)
+
+    def test_failed_fetch_leaves_the_cursor(self, get_redis_connection):
+        gardens = self.create_gardens(3)
+        StubRPCHandler.failing = {gardens[1].owner.wallet_address}
+        results = BlockchainMonitor().monitor_user_activities(gardens)
+        self.assertEqual(
+            [garden.id for garden, _ in results], [gardens[0].id, gardens[2].id]
+        )
+        cursors = dict(Garden.objects.values_list("id", "last_processed_block"))
+        self.assertEqual(cursors[gardens[0].id], LATEST_BLOCK - 1)
+        self.assertIsNone(cursors[gardens[1].id])
+
+    def test_explorer_cursor_pages_past_seen_transactions(self, get_redis_connection):
+        garden = self.create_gardens(1)[0]
+        wallet = garden.owner.wallet_address
+        StubRPCHandler.transactions[wallet] = [
+            make_transaction(50, index) for index in range(3)
+        ] + [make_transaction(51, index) for index in range(4)]
+        garden.last_processed_block, garden.last_processed_tx_index = 50, 1
+        garden.save()
+        with self.settings(
+            BLOCKCHAIN_MONITOR={
+                **settings.BLOCKCHAIN_MONITOR,
+                "EXPLORER_PAGE_SIZE": 2,
+                "EXPLORER_MAX_PAGES": 3,
+            }
+        ):
+            [(_, activities)] = BlockchainMonitor().monitor_user_activities([garden])
+        # Pages of 2 from the cursor block; the third page is the last allowed
+        self.assertEqual(
+            [(params["page"], params["startblock"]) for params in StubRPCHandler.gets],
+            [("1", "50"), ("2", "50"), ("3", "50")],
+        )
+        # (50, 2), (51, 0), (51, 1) and (51, 2) are past the cursor
+        self.assertEqual(activities, ["transfer"] * 4)
+        garden.refresh_from_db()
+        self.assertEqual(
+            (garden.last_processed_block, garden.last_processed_tx_index), (51, 2)
+        )
+        # The next run resumes where this one stopped
+        StubRPCHandler.gets = []
+        [(_, activities)] = BlockchainMonitor().monitor_user_activities([garden])
+        self.assertEqual(activities, ["transfer"])
+        self.assertEqual(StubRPCHandler.gets[0]["startblock"], "51")
+
+    def test_garden_without_cursor_reads_recent_transactions(
+        self, get_redis_connection
+    ):
+        garden = self.create_gardens(1)[0]
+        params = BlockchainMonitor._build_activity_params(garden, page=3)
+        self.assertEqual(
+            (params["page"], params["offset"], params["sort"], params["startblock"]),
+            (1, 10, "desc", 0),
+        )
+        self.assertEqual(params["address"], garden.owner.wallet_address)
+        self.assertFalse(BlockchainMonitor._has_next_page(garden, params, [{}] * 10))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class NetworkWindowTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_totals_follow_the_window(self):
+        window = NetworkWindow(3)
+        for block in range(1, 6):
+            window.push(block, block * 10, block * 100, block / 10)
+        # Old and repeated blocks are ignored
+        window.push(4, 1000, 1, 1.0)
+        window.push(5, 1000, 1, 1.0)
+        self.assertEqual([sample[0] for sample in window.samples], [3, 4, 5])
+        self.assertEqual(window.get_transaction_count(), 40)
+        self.assertAlmostEqual(window.get_utilization(), 0.4)
+
+    def test_missing_blocks(self):
+        window = NetworkWindow(4)
+        self.assertEqual(window.get_missing_blocks(2), [0, 1, 2])
+        self.assertEqual(window.get_missing_blocks(100), [97, 98, 99, 100])
+        window.push(98, 1, 1, 0.5)
+        self.assertEqual(window.get_missing_blocks(100), [99, 100])
+        self.assertEqual(window.get_missing_blocks(98), [])
+        # A window too far behind refills from the newest blocks only
+        self.assertEqual(window.get_missing_blocks(200), [197, 198, 199, 200])
+
+    def test_base_fee_percentile(self):
+        window = NetworkWindow(5)
+        self.assertIsNone(window.get_base_fee_percentile(50))
+        for block, base_fee in enumerate([40, None, 10, 30, 20]):
+            window.push(block, 1, base_fee, 0.5)
+        self.assertEqual(window.get_base_fee_percentile(50), 20)
+        self.assertEqual(window.get_base_fee_percentile(75), 30)
+        self.assertEqual(window.get_base_fee_percentile(100), 40)
+        self.assertEqual(window.get_base_fee_percentile(0), 10)
+
+    def test_saved_window_is_reloaded_unless_resized(self):
+        window = NetworkWindow.load()
+        window.push(7, 3, 30, 0.5)
+        window.save()
+        self.assertEqual(NetworkWindow.load().head, 7)
+        metrics_window = settings.BLOCKCHAIN_MONITOR["METRICS_WINDOW"] + 1
+        with self.settings(
+            BLOCKCHAIN_MONITOR={
+                **settings.BLOCKCHAIN_MONITOR,
+                "METRICS_WINDOW": metrics_window,
+            }
+        ):
+            window = NetworkWindow.load()
+        self.assertEqual(window.size, metrics_window)
+        self.assertIsNone(window.head)
+
+
+class TimeSeriesTestCase(TestCase):
+    def setUp(self):
+        # Three days back, past the raw retention, at the start of an hour
+        self.start = (timezone.now() - timedelta(days=3)).replace(
+            minute=0, second=0, microsecond=0
+        )
+
+    def add_sample(self, seconds, transaction_count, weather_type):
+        timestamp = self.start + timedelta(seconds=seconds)
+        metrics = BlockchainMetrics.objects.create(
+            transaction_count=transaction_count,
+            average_gas_price=100,
+            block_number=seconds,
+            network_load=transaction_count / 100,
+        )
+        weather = create_weather(weather_type)
+        BlockchainMetrics.objects.filter(id=metrics.id).update(timestamp=timestamp)
+        WeatherState.objects.filter(id=weather.id).update(timestamp=timestamp)
+
+    def get_rollups(self, model, resolution, *fields):
+        return list(
+            model.objects.filter(resolution=resolution)
+            .order_by("bucket")
+            .values_list("samples", *fields)
+        )
+
+    def test_rollups_are_sample_weighted(self):
+        self.add_sample(0, 10, "rainy")
+        self.add_sample(20, 20, "rainy")
+        self.add_sample(70, 60, "sunny")
+        TimeSeriesService.rollup()
+        self.assertEqual(
+            self.get_rollups(MetricsRollup, "minute", "transaction_count"),
+            [(2, 15.0), (1, 60.0)],
+        )
+        # Hours average the minutes by their samples, not per minute, and
+        # keep the weather that covered most samples
+        for resolution in ["hour", "day"]:
+            self.assertEqual(
+                self.get_rollups(
+                    MetricsRollup, resolution, "transaction_count", "block_number"
+                ),
+                [(3, 30.0, 70)],
+            )
+            self.assertEqual(
+                self.get_rollups(WeatherRollup, resolution, "weather_type"),
+                [(3, "rainy")],
+            )
+
+    def test_rerun_refills_the_newest_bucket(self):
+        self.add_sample(0, 10, "sunny")
+        self.add_sample(70, 20, "sunny")
+        TimeSeriesService.rollup()
+        self.add_sample(80, 50, "stormy")
+        self.add_sample(90, 50, "stormy")
+        TimeSeriesService.rollup()
+        self.assertEqual(
+            self.get_rollups(WeatherRollup, "minute", "weather_type"),
+            [(1, "sunny"), (3, "stormy")],
+        )
+        self.assertEqual(
+            self.get_rollups(MetricsRollup, "hour", "transaction_count"),
+            [(4, 32.5)],
+        )
+
+    def test_prune_keeps_rows_until_they_are_rolled_up(self):
+        self.add_sample(0, 10, "sunny")
+        self.add_sample(20, 20, "sunny")
+        self.add_sample(70, 30, "cloudy")
+        self.assertEqual(TimeSeriesService.prune(), {})
+        self.assertEqual(BlockchainMetrics.objects.count(), 3)
+        TimeSeriesService.rollup()
+        stats = TimeSeriesService.prune()
+        # Past retention, but the newest minute may still be filling up
+        self.assertEqual(stats["metrics_minute_source"], 2)
+        self.assertEqual(stats["weather_minute_source"], 2)
+        self.assertEqual(
+            list(BlockchainMetrics.objects.values_list("transaction_count", flat=True)),
+            [30],
+        )
+        # Minute rollups are within their retention
+        self.assertEqual(MetricsRollup.objects.filter(resolution="minute").count(), 2)
+
+
+def create_weather(weather_type):
+    return WeatherState.objects.create(
+        weather_type=weather_type, temperature=20.0, rainfall=0, sunlight=50
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@mock.patch("blockchain.services.get_redis_connection")
+class WeatherSnapshotTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        WeatherSnapshot._local = None
+        WeatherSnapshot._checked_at = 0.0
+        self.addCleanup(setattr, WeatherSnapshot, "_local", None)
+
+    def test_published_weather_is_read_without_queries(self, get_redis_connection):
+        weather = create_weather("sunny")
+        first = WeatherSnapshot.publish(weather)
+        second = WeatherSnapshot.publish(create_weather("rainy"))
+        self.assertEqual(second, first + 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(WeatherSnapshot.get().weather_type, "rainy")
+            self.assertEqual(WeatherSnapshot.get_version(), second)
+        get_redis_connection.return_value.publish.assert_called_with(
+            settings.GARDEN_EVENTS["CHANNEL"], json.dumps({"weather": second})
+        )
+
+    def test_other_processes_see_new_weather_after_the_local_ttl(
+        self, get_redis_connection
+    ):
+        WeatherSnapshot.publish(create_weather("sunny"))
+        # Another process writes through a newer state
+        local = WeatherSnapshot._local
+        WeatherSnapshot.publish(create_weather("stormy"))
+        WeatherSnapshot._local = local
+        self.assertEqual(WeatherSnapshot.get().weather_type, "sunny")
+        WeatherSnapshot._checked_at = (
+            time.monotonic() - settings.WEATHER_SNAPSHOT_LOCAL_TTL
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(WeatherSnapshot.get().weather_type, "stormy")
+
+    def test_cold_cache_falls_back_to_the_newest_state(self, get_redis_connection):
+        self.assertIsNone(WeatherSnapshot.get())
+        create_weather("cloudy")
+        WeatherState.objects.update(timestamp=timezone.now() - timedelta(hours=1))
+        create_weather("rainy")
+        with self.assertNumQueries(1):
+            self.assertEqual(WeatherSnapshot.get().weather_type, "rainy")
+        # Written back, so the next read skips the database
+        WeatherSnapshot._local = None
+        with self.assertNumQueries(0):
+            self.assertEqual(WeatherSnapshot.get().weather_type, "rainy")
+
+
+class BlockScanTestCase(TestCase):
+    def setUp(self):
+        WalletIndex._refreshed_at = None
+        self.addCleanup(setattr, WalletIndex, "_refreshed_at", None)
+        self.gardens = []
+        for index in range(2):
+            owner = User.objects.create_user(wallet_address=f"0x{index + 1:040x}")
+            self.gardens.append(Garden.objects.create(owner=owner))
+        self.wallets = [garden.owner.wallet_address for garden in self.gardens]
+        BlockCursor.objects.create(name="activity_ingestion", block_number=10)
+        self.in_transaction = False
+        self.monitor = BlockchainMonitor()
+        self.monitor.w3 = mock.Mock()
+        self.monitor.w3.eth.block_number = 12
+        self.monitor.w3.eth.get_block.side_effect = self.get_block
+        self.monitor.w3.eth.get_transaction_receipt.side_effect = self.get_receipt
+        self.blocks = {
+            11: [
+                # A self-transfer, a transfer between two gardens and an
+                # unknown sender
+                {"hash": "0x1", "from": self.wallets[0], "to": self.wallets[0]},
+                {"hash": "0x2", "from": self.wallets[0], "to": self.wallets[1]},
+                {"hash": "0x3", "from": f"0x{'ff' * 20}", "to": self.wallets[1]},
+            ],
+            12: [
+                {"hash": "0x4", "from": self.wallets[1], "to": None},
+                {"hash": "0x5", "from": self.wallets[1], "to": None, "value": 0},
+            ],
+        }
+        self.reverted = {"0x4"}
+
+    def get_block(self, block_number, full_transactions):
+        # RPC calls must not run while the cursor is locked
+        self.assertFalse(self.in_transaction)
+        return {
+            "transactions": [
+                {"value": 1, **tx} for tx in self.blocks[block_number]
+            ]
+        }
+
+    def get_receipt(self, tx_hash):
+        self.assertFalse(self.in_transaction)
+        return {"status": 0 if tx_hash in self.reverted else 1}
+
+    @contextmanager
+    def tracked_atomic(self):
+        self.in_transaction = True
+        try:
+            with atomic():
+                yield
+        finally:
+            self.in_transaction = False
+
+    def test_blocks_are_scanned_outside_the_cursor_lock(self):
+        with mock.patch("blockchain.services.atomic", self.tracked_atomic):
+            activities = dict(self.monitor.scan_new_blocks())
+        self.assertEqual(
+            activities,
+            {
+                self.gardens[0].id: ["transfer", "transfer"],
+                self.gardens[1].id: ["transfer", "transfer"],
+            },
+        )
+        # One receipt per matched transaction
+        self.assertEqual(
+            self.monitor.w3.eth.get_transaction_receipt.call_count, 4
+        )
+        self.assertEqual(BlockCursor.objects.get().block_number, 12)
+
+    def test_scan_overtaken_by_another_is_dropped(self):
+        def advance_cursor(block_number, full_transactions):
+            BlockCursor.objects.update(block_number=12)
+            return self.get_block(block_number, full_transactions)
+
+        self.monitor.w3.eth.get_block.side_effect = advance_cursor
+        self.assertEqual(self.monitor.scan_new_blocks(), [])
+        self.assertEqual(BlockCursor.objects.get().block_number, 12)
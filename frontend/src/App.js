@@ -14,7 +14,9 @@ import {
   getPlantTypes,
   plantSeed,
   removePlant,
+  openGardenEvents,
 } from "./services/api";
+import environment from "./config/environment";
 import { GardenView } from "./components/GardenView";
 import { PlantDetails } from "./components/PlantDetails";
 import { GardenStats } from "./components/GardenStats";
@@ -146,8 +148,48 @@ function App() {
   useEffect(() => {
     if (authToken) {
       loadGardenData();
-      const interval = setInterval(loadGardenData, 30000); // Every 30 seconds
-      return () => clearInterval(interval);
+      // Poll until the stream delivers its first garden, and again if it
+      // drops: a stream that never connects may not report an error
+      let interval = null;
+      let events = null;
+      let closed = false;
+      const startPolling = () => {
+        if (!interval) {
+          interval = setInterval(loadGardenData, environment.POLLING_INTERVAL);
+        }
+      };
+      const stopPolling = () => {
+        if (interval) clearInterval(interval);
+        interval = null;
+      };
+      startPolling();
+      if (environment.GARDEN_EVENTS) {
+        openGardenEvents({
+          onGarden: (gardenData) => {
+            stopPolling();
+            setGarden(gardenData);
+          },
+          onWeather: setWeather,
+        })
+          .then((source) => {
+            if (closed) {
+              source.close();
+              return;
+            }
+            events = source;
+            // Tickets are single-use, so the stream cannot reconnect itself
+            events.onerror = () => {
+              events.close();
+              startPolling();
+            };
+          })
+          .catch(() => {});
+      }
+      return () => {
+        closed = true;
+        if (events) events.close();
+        stopPolling();
+      };
     }
   }, [authToken]);
 
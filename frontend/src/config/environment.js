@@ -12,6 +12,8 @@ const environment = {
     process.env.REACT_APP_POLLING_INTERVAL || "30000",
     10
   ),
+  // Only enable when the backend serves garden event streams (ASGI)
+  GARDEN_EVENTS: process.env.REACT_APP_GARDEN_EVENTS === "true",
 };
 
 export default environment;
@@ -35,6 +35,24 @@ export const getGardenDetails = async () => {
   return response.data.data;
 };
 
+// Stream garden and weather updates as they happen (EventSource cannot
+// send headers, so the stream is opened with a short-lived, single-use
+// ticket rather than the auth token)
+export const openGardenEvents = async ({ onGarden, onWeather }) => {
+  const response = await api.post("/garden/events/ticket/", {});
+  const { ticket } = response.data.data;
+  const events = new EventSource(
+    `${environment.API_URL}/garden/events/?ticket=${encodeURIComponent(ticket)}`
+  );
+  events.addEventListener("garden", (event) =>
+    onGarden(JSON.parse(event.data).data)
+  );
+  events.addEventListener("weather", (event) =>
+    onWeather(JSON.parse(event.data))
+  );
+  return events;
+};
+
 // Retrieve garden weather details
 export const getCurrentWeather = async () => {
   const response = await api.get("/garden/status/");
@@ -1,5 +1,7 @@
 from django.contrib.admin import register, ModelAdmin
+from django.db.transaction import on_commit
 from .models import Garden, PlantType, Plant
+from .services import PlantCatalog
 
 
 @register(Garden)
@@ -37,6 +39,19 @@ class PlantTypeAdmin(ModelAdmin):
     readonly_fields = ["id", "created"]
     search_fields = ["name", "description"]
 
+    # Every change rebuilds the in-memory plant catalogs
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        on_commit(PlantCatalog.invalidate)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        on_commit(PlantCatalog.invalidate)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        on_commit(PlantCatalog.invalidate)
+
 
 @register(Plant)
 class PlantAdmin(ModelAdmin):
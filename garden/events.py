@@ -0,0 +1,216 @@
+"""
+Server-sent garden updates.
+GardenCache.publish and WeatherSnapshot.publish announce changes on one
+Redis pub/sub channel. Each ASGI process holds a single subscription and fans
+messages out to its open streams, so an idle stream costs one coroutine.
+"""
+
+from asgiref.sync import sync_to_async
+from collections import defaultdict
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from redis import asyncio as aioredis
+from redis.exceptions import ConnectionError, TimeoutError
+from rest_framework.exceptions import AuthenticationFailed
+from base.renderers import ORJSONRenderer
+from blockchain.serializers import WeatherStateSerializer
+from blockchain.services import WeatherSnapshot
+from user.authentication import WalletTokenAuthentication
+from user.backends import WalletAuthenticationBackend
+from .services import GardenCache, GardenEventTicket
+from .views import build_garden_payload, render_cached
+import asyncio
+import json
+
+
+class GardenSubscription:
+    """Changes waiting to be pushed to one open stream"""
+
+    def __init__(self, garden_id):
+        self.garden_id = garden_id
+        self.pending = set()  # "garden" and/or "weather"
+        self.changed = asyncio.Event()
+
+    def notify(self, kind):
+        # Bursts of changes coalesce into a single push per kind
+        self.pending.add(kind)
+        self.changed.set()
+
+
+class GardenEventHub:
+    """Per-process Redis subscription shared by every open garden stream"""
+
+    subscriptions = defaultdict(set)  # garden_id -> subscriptions
+    _listener = None
+
+    @classmethod
+    def subscribe(cls, garden_id):
+        """Registers a stream, starting the shared listener on first use"""
+        if cls._listener is None or cls._listener.done():
+            cls._listener = asyncio.get_running_loop().create_task(cls._listen())
+        subscription = GardenSubscription(garden_id)
+        cls.subscriptions[garden_id].add(subscription)
+        return subscription
+
+    @classmethod
+    def unsubscribe(cls, subscription):
+        subscriptions = cls.subscriptions.get(subscription.garden_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del cls.subscriptions[subscription.garden_id]
+
+    @classmethod
+    def dispatch(cls, event):
+        """Notifies the streams an announced change concerns"""
+        if "weather" in event:
+            for subscriptions in cls.subscriptions.values():
+                for subscription in subscriptions:
+                    subscription.notify("weather")
+        for garden_id in event.get("gardens", []):
+            for subscription in cls.subscriptions.get(garden_id, ()):
+                subscription.notify("garden")
+
+    @classmethod
+    def resync(cls):
+        """Refreshes every stream, after changes may have gone unannounced"""
+        for subscriptions in cls.subscriptions.values():
+            for subscription in subscriptions:
+                subscription.notify("garden")
+                subscription.notify("weather")
+
+    @classmethod
+    async def _listen(cls):
+        """
+        Reads the change channel until the process exits. When Redis drops
+        the subscription, resubscribes with exponential backoff, then
+        refreshes every stream for the changes published meanwhile.
+        """
+        delay = settings.GARDEN_EVENTS["RECONNECT_SECONDS"]
+        reconnecting = False
+        while True:
+            client = aioredis.from_url(settings.REDIS_URL)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(settings.GARDEN_EVENTS["CHANNEL"])
+                if reconnecting:
+                    cls.resync()
+                    reconnecting = False
+                delay = settings.GARDEN_EVENTS["RECONNECT_SECONDS"]
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        cls.dispatch(json.loads(message["data"]))
+                    except ValueError as e:
+                        print(f"Ignoring malformed garden event: {str(e)}")
+            except (ConnectionError, TimeoutError, OSError) as e:
+                print(f"Garden event subscription lost, retrying in {delay}s: {e}")
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+            reconnecting = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.GARDEN_EVENTS["MAX_RECONNECT_SECONDS"])
+
+
+def render_garden_event(garden_id):
+    """Renders a garden's current state as an SSE message"""
+    state = GardenCache.get_current_version(id=garden_id)
+    if state is None:
+        return None
+    garden_id, version = state
+    content = render_cached(
+        GardenCache.get_key("garden", garden_id, version),
+        lambda: build_garden_payload(garden_id),
+    )
+    return b"event: garden\nid: %d\ndata: %s\n\n" % (version, content)
+
+
+def render_weather_event():
+    """Renders the newest weather state as an SSE message"""
+    weather = WeatherSnapshot.get()
+    content = (
+        ORJSONRenderer().render(WeatherStateSerializer(weather).data)
+        if weather
+        else b"null"
+    )
+    return b"event: weather\ndata: %s\n\n" % content
+
+
+async def stream_garden_events(garden_id):
+    """Yields the garden and weather, then every change to them"""
+    subscription = GardenEventHub.subscribe(garden_id)
+    renderers = {
+        "garden": sync_to_async(render_garden_event),
+        "weather": sync_to_async(render_weather_event),
+    }
+    try:
+        subscription.notify("garden")
+        subscription.notify("weather")
+        while True:
+            try:
+                await asyncio.wait_for(
+                    subscription.changed.wait(),
+                    settings.GARDEN_EVENTS["HEARTBEAT_SECONDS"],
+                )
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing the idle connection
+                yield b": keep-alive\n\n"
+                continue
+            kinds = sorted(subscription.pending)
+            subscription.pending.clear()
+            subscription.changed.clear()
+            for kind in kinds:
+                if kind == "garden":
+                    message = await renderers[kind](garden_id)
+                else:
+                    message = await renderers[kind]()
+                if message:
+                    yield message
+    finally:
+        GardenEventHub.unsubscribe(subscription)
+
+
+async def garden_events(request):
+    """
+    Streams a user's garden and the weather as server-sent events.
+    Browsers cannot set headers on EventSource, so they authenticate with a
+    single-use ticket from GardenEventTicketView in the ticket query
+    parameter; other clients may send the token header.
+    """
+    if not settings.GARDEN_EVENTS["ENABLED"]:
+        return JsonResponse(
+            {"status": "error", "error": "Garden events are disabled."}, status=404
+        )
+    try:
+        token = WalletTokenAuthentication.retrieve_token(
+            request, WalletTokenAuthentication.keyword
+        )
+        ticket = request.GET.get("ticket")
+        user_id = None
+        if token:
+            user = await sync_to_async(
+                WalletAuthenticationBackend.validate_auth_token
+            )(token)
+            user_id = user.id if user else None
+        elif ticket:
+            user_id = await sync_to_async(GardenEventTicket.redeem)(ticket)
+        if user_id is None:
+            raise AuthenticationFailed("Invalid or expired token.")
+    except AuthenticationFailed as e:
+        return JsonResponse(
+            {"status": "error", "error": str(e.detail)}, status=e.status_code
+        )
+    state = await sync_to_async(GardenCache.get_current_version)(owner_id=user_id)
+    if state is None:
+        return JsonResponse(
+            {"status": "error", "error": "Garden not found."}, status=404
+        )
+    response = StreamingHttpResponse(
+        stream_garden_events(state[0]), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stop reverse proxies from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -16,13 +16,21 @@ from django.db.models import (
     UniqueConstraint,
     PROTECT,
     BooleanField,
+    PositiveBigIntegerField,
+    QuerySet,
+    Index,
+    Q,
 )
 from django.contrib.auth import get_user_model
-from base.utils import generate_id
+from base.utils import generate_id, get_growth_tick
 
 
 User = get_user_model()
 
+# Plants that can still change: harvested plants stop growing and plants
+# without health neither grow nor lose more health
+ACTIVE_PLANTS = Q(health__gt=0) & ~Q(growth_stage="harvest")
+
 
 class Garden(Model):
     id = CharField(
@@ -41,9 +49,21 @@ class Garden(Model):
     pest_severity = PositiveIntegerField(default=0)  # 0-100
     last_activity = DateTimeField(null=True)  # Track user's last onchain activity
     total_onchain_actions = PositiveIntegerField(default=0)
-    last_processed_hash = CharField(
-        max_length=66, null=True, db_index=True
-    )  # Transaction hash is 66 chars with '0x'
+    growth_tick = PositiveBigIntegerField(
+        default=get_growth_tick
+    )  # Growth tick all plants were last materialized at in lazy mode
+    version = PositiveBigIntegerField(
+        default=0
+    )  # Bumped whenever the garden or its plants change, see GardenCache
+    last_processed_block = PositiveBigIntegerField(
+        null=True
+    )  # Explorer cursor: block of the newest processed transaction
+    last_processed_tx_index = PositiveIntegerField(
+        default=0
+    )  # Explorer cursor: that transaction's index within its block
+    tombstone_floor = PositiveBigIntegerField(
+        default=0
+    )  # Newest version whose plant tombstones were pruned
     created = DateTimeField(auto_now_add=True)
     updated = DateTimeField(auto_now=True)
 
@@ -69,6 +89,12 @@ class PlantType(Model):
         return self.name
 
 
+class PlantQuerySet(QuerySet):
+    def active(self):
+        """Plants the growth cycle can still change"""
+        return self.filter(ACTIVE_PLANTS)
+
+
 class Plant(Model):
     """Individual plant instance in a garden"""
 
@@ -91,9 +117,29 @@ class Plant(Model):
     slot_position = PositiveIntegerField()  # Position in garden (0 to plot_size-1)
     pest_damage = PositiveIntegerField(default=0)  # 0-100
     growth_multiplier = FloatField(default=1.0)  # Affected by user activity
+    growth_tick = PositiveBigIntegerField(
+        default=get_growth_tick
+    )  # Last growth tick applied, so a retried cycle never applies it twice
+    version = PositiveBigIntegerField(
+        default=0
+    )  # Garden version of the plant's last change, for delta reads
+
+    objects = PlantQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created"]
+        indexes = [
+            Index(fields=["growth_stage", "health"], name="plant_stage_health_idx"),
+            # Partial indexes only hold active plants, so terminal plants add
+            # nothing to growth cycle scans however many accumulate
+            Index(fields=["id"], condition=ACTIVE_PLANTS, name="plant_active_idx"),
+            Index(
+                fields=["growth_tick", "garden"],
+                condition=ACTIVE_PLANTS,
+                name="plant_active_tick_idx",
+            ),
+            Index(fields=["garden", "version"], name="plant_garden_version_idx"),
+        ]
         constraints = [
             UniqueConstraint(
                 fields=["garden", "slot_position"], name="unique_garden_slot"
@@ -102,3 +148,21 @@ class Plant(Model):
 
     def __str__(self):
         return self.plant_type.name
+
+
+class PlantTombstone(Model):
+    """Records a removed plant so delta reads can report the deletion"""
+
+    garden = ForeignKey(Garden, on_delete=CASCADE, related_name="tombstones")
+    plant_id = CharField(max_length=21)
+    version = PositiveBigIntegerField()  # Garden version of the removal
+    created = DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["version"]
+        indexes = [
+            Index(fields=["garden", "version"], name="tombstone_garden_version_idx")
+        ]
+
+    def __str__(self):
+        return f"Removed plant {self.plant_id}"
@@ -1,5 +1,11 @@
-from rest_framework.serializers import ModelSerializer, CharField, ValidationError
+from rest_framework.serializers import (
+    ModelSerializer,
+    CharField,
+    DateTimeField,
+    ValidationError,
+)
 from .models import Garden, Plant, PlantType
+from .services import PlantCatalog
 
 
 class PlantTypeSerializer(ModelSerializer):
@@ -45,6 +51,11 @@ class PlantSerializer(ModelSerializer):
             "pest_damage",
         ]
 
+    def validate_plant_type_id(self, value):
+        if PlantCatalog.get_record(value) is None:
+            raise ValidationError("Invalid plant type.")
+        return value
+
     def validate_slot_position(self, value):
         garden = self.context["garden"]
         if value >= garden.plot_size:
@@ -86,3 +97,137 @@ class GardenSerializer(ModelSerializer):
             "last_activity",
             "total_onchain_actions",
         ]
+
+
+class FastGardenSerializer:
+    """
+    Read-only GardenSerializer output built straight from .values() rows
+    and the PlantCatalog. Skips DRF field introspection and per-field
+    to_representation calls while producing the same keys, order and value
+    formats.
+    """
+
+    _datetime = DateTimeField()  # Formats timestamps exactly as DRF does
+
+    @classmethod
+    def _format_datetime(cls, value):
+        return cls._datetime.to_representation(value)
+
+    # (field, converter) pairs in GardenSerializer/PlantSerializer order
+    PLANT_FIELDS = [
+        ("id", str),
+        ("plant_type", None),  # Nested PlantTypeSerializer output
+        ("growth_stage", str),
+        ("health", int),
+        ("growth_progress", float),
+        ("created", "datetime"),
+        ("updated", "datetime"),
+        ("slot_position", int),
+        ("growth_multiplier", float),
+        ("pest_damage", int),
+    ]
+    GARDEN_FIELDS = [
+        ("id", str),
+        ("level", int),
+        ("soil_quality", int),
+        ("plot_size", int),
+        ("plants", None),  # Nested PlantSerializer output
+        ("created", "datetime"),
+        ("updated", "datetime"),
+        ("pest_infestation", bool),
+        ("pest_type", str),
+        ("pest_severity", int),
+        ("last_activity", "datetime"),
+        ("total_onchain_actions", int),
+    ]
+
+    @classmethod
+    def _get_converters(cls, fields):
+        return [
+            (
+                name,
+                cls._format_datetime if converter == "datetime" else converter,
+            )
+            for name, converter in fields
+            if converter is not None
+        ]
+
+    @staticmethod
+    def _convert(row, converters):
+        # Nulls stay null, as in Serializer.to_representation
+        return {
+            name: None if value is None else converter(value)
+            for (name, converter), value in zip(converters, row)
+        }
+
+    @classmethod
+    def serialize(cls, garden_id):
+        """Returns GardenSerializer(garden).data for a garden id, as a dict"""
+        garden_converters = cls._get_converters(cls.GARDEN_FIELDS)
+        plant_converters = cls._get_converters(cls.PLANT_FIELDS)
+        garden_row = (
+            Garden.objects.filter(id=garden_id)
+            .values_list(*(name for name, _ in garden_converters))
+            .get()
+        )
+        plant_rows = Plant.objects.filter(garden_id=garden_id).values_list(
+            *(name for name, _ in plant_converters), "plant_type_id"
+        )
+        plants = []
+        for row in plant_rows:
+            plant = cls._convert(row[:-1], plant_converters)
+            # Plant types come pre-serialized from the in-memory catalog
+            plants.append(
+                {
+                    "id": plant.pop("id"),
+                    "plant_type": PlantCatalog.get_serialized(row[-1]),
+                    **plant,
+                }
+            )
+        garden = cls._convert(garden_row, garden_converters)
+        keys = [name for name, _ in cls.GARDEN_FIELDS]
+        garden["plants"] = plants
+        return {key: garden[key] for key in keys}
+
+
+class PlantChangeSerializer(ModelSerializer):
+    """Compact plant for delta reads; plant types are referenced by id"""
+
+    class Meta:
+        model = Plant
+        fields = [
+            "id",
+            "plant_type",
+            "growth_stage",
+            "health",
+            "growth_progress",
+            "created",
+            "updated",
+            "slot_position",
+            "growth_multiplier",
+            "pest_damage",
+            "version",
+        ]
+        read_only_fields = fields
+
+
+class GardenChangeSerializer(ModelSerializer):
+    """Garden fields without plants, for delta reads"""
+
+    class Meta:
+        model = Garden
+        fields = [
+            "id",
+            "version",
+            "level",
+            "soil_quality",
+            "plot_size",
+            "created",
+            "updated",
+            "pest_infestation",
+            "pest_type",
+            "pest_severity",
+            "last_activity",
+            "total_onchain_actions",
+        ]
+        read_only_fields = fields
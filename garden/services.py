@@ -4,9 +4,24 @@ Handles growth calculations, pest management, and blockchain activity integratio
 """
 
 from django.utils import timezone
-from datetime import timedelta
-from blockchain.models import WeatherState
-import random
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Greatest, Least
+from django.db.transaction import atomic, on_commit
+from django_redis import get_redis_connection
+from datetime import datetime, timedelta, timezone as dt_timezone
+from bisect import bisect_right
+from collections import namedtuple
+from blockchain.models import WeatherState, WeatherRollup
+from blockchain.services import WeatherSnapshot
+from base.utils import generate_hex_token, get_growth_tick
+from types import MappingProxyType
+import numpy as np
+import json
+import threading
+import time
 
 
 class GrowthService:
@@ -15,22 +30,48 @@ class GrowthService:
         "slugs": {"damage": 0.3, "solution": "transfer"}, # Temporary solution
         "fungus": {"damage": 0.4, "solution": "transfer"},
     }
+    # Seconds per pest roll tick, matching the roll_garden_pests schedule
+    PEST_ROLL_SECONDS = 60
     BASE_GROWTH_RATE = 0.05
+    WEATHER_GROWTH_MULTIPLIERS = {
+        "sunny": 0.5,
+        "cloudy": 0.3,
+        "rainy": 0.2,
+        "stormy": 0.1,
+    }
+    # Stage codes follow Plant.STAGE_CHOICES order
+    GROWTH_STAGES = ["seed", "sprout", "growing", "mature", "flowering", "harvest"]
+    # Minimum progress for each stage from "sprout" to "harvest"
+    STAGE_THRESHOLDS = [10, 30, 60, 80, 100]
+    # Columns needed to compute a growth cycle and columns it writes back
+    GROWTH_READ_FIELDS = [
+        "id",
+        "growth_stage",
+        "health",
+        "growth_progress",
+        "pest_damage",
+        "garden__soil_quality",
+        "garden__pest_infestation",
+        "plant_type_id",
+    ]
+    GROWTH_WRITE_FIELDS = [
+        "growth_progress",
+        "health",
+        "growth_stage",
+        "growth_tick",
+        "updated",
+        "version",
+    ]
 
     @staticmethod
     def calculate_growth(plant, weather):
         """Calculate plant growth based on conditions"""
         try:
             base_growth = plant.plant_type.growth_rate * GrowthService.BASE_GROWTH_RATE
-            # Weather effects
-            weather_multipliers = {
-                "sunny": 0.5,
-                "cloudy": 0.3,
-                "rainy": 0.2,
-                "stormy": 0.1,
-            }
             # Calculate growth
-            weather_effect = weather_multipliers.get(weather.weather_type, 1.0)
+            weather_effect = GrowthService.WEATHER_GROWTH_MULTIPLIERS.get(
+                weather.weather_type, 1.0
+            )
             soil_effect = plant.garden.soil_quality / 100
             health_effect = plant.health / 100
             # Apply pest damage reduction
@@ -48,64 +89,180 @@ class GrowthService:
         except Exception as e:
             raise Exception(f"Failed to calculate growth: {str(e)}")
 
-    @staticmethod
-    def check_for_pests(garden):
-        """Random pest infestations based on conditions"""
+    @classmethod
+    def roll_pests(cls, seed=None, now=None):
+        """
+        Random pest infestations for every eligible garden at once.
+        Draws all rolls, pest types and severities from one NumPy generator
+        and applies hits with one Garden and one Plant UPDATE. A seed makes
+        rolls reproducible: each roll tick draws from the seed and its tick,
+        so successive rolls differ. Returns the number of gardens infested.
+        """
         try:
-            if garden.pest_infestation:
-                return
-            # Higher chance during certain weather conditions
-            base_chance = 0.05  # 5% base chance
-            if (
-                not garden.last_activity
-                or (timezone.now() - garden.last_activity).days > 2
-            ):
-                base_chance *= 2  # Double chance if inactive
-            if random.random() < base_chance:
-                pest_type = random.choice(list(GrowthService.PEST_TYPES.keys()))
-                garden.pest_infestation = True
-                garden.pest_type = pest_type
-                garden.pest_severity = random.randint(30, 70)
-                garden.save()
-                # Apply initial damage to plants
-                for plant in garden.plants.all():
-                    plant.pest_damage = garden.pest_severity
-                    plant.save()
+            from .models import Garden, Plant
+
+            now = now or timezone.now()
+            gardens = list(
+                Garden.objects.filter(
+                    pest_infestation=False,
+                    owner__is_active=True,
+                    owner__wallet_address__isnull=False,
+                )
+                .exclude(owner__wallet_address="")
+                .order_by("id")  # Seeded rolls hit the same gardens
+                .values_list("id", "last_activity")
+            )
+            if not gardens:
+                return 0
+            roll_tick = int(now.timestamp()) // cls.PEST_ROLL_SECONDS
+            rng = np.random.default_rng(None if seed is None else [seed, roll_tick])
+            # Higher chance for gardens inactive for more than two days
+            inactive = np.array(
+                [
+                    not last_activity or (now - last_activity).days > 2
+                    for _, last_activity in gardens
+                ]
+            )
+            base_chance = np.where(inactive, 0.1, 0.05)
+            hits = np.flatnonzero(rng.random(len(gardens)) < base_chance)
+            if not len(hits):
+                return 0
+            pest_types = list(cls.PEST_TYPES.keys())
+            type_codes = rng.integers(len(pest_types), size=len(hits))
+            severities = rng.integers(30, 71, size=len(hits))
+            pests = {
+                gardens[index][0]: (pest_types[type_code], int(severity))
+                for index, type_code, severity in zip(hits, type_codes, severities)
+            }
+            # Past ticks grew without the pests
+            if settings.GARDEN["GROWTH_MODE"] == "lazy":
+                cls.materialize_gardens(list(pests))
+            with atomic():
+                # Lock every hit garden up front in id order, as the growth
+                # cycle does, keeping those still free of pests
+                infested_ids = list(
+                    Garden.objects.select_for_update()
+                    .filter(id__in=list(pests), pest_infestation=False)
+                    .order_by("id")
+                    .values_list("id", flat=True)
+                )
+                if not infested_ids:
+                    return 0
+                infested = [
+                    Garden(
+                        id=garden_id,
+                        pest_infestation=True,
+                        pest_type=pests[garden_id][0],
+                        pest_severity=pests[garden_id][1],
+                        updated=now,
+                        version=F("version") + 1,
+                    )
+                    for garden_id in infested_ids
+                ]
+                Garden.objects.bulk_update(
+                    infested,
+                    [
+                        "pest_infestation",
+                        "pest_type",
+                        "pest_severity",
+                        "updated",
+                        "version",
+                    ],
+                )
+                # Apply initial damage to plants, stamped with the new version
+                garden = Garden.objects.filter(id=OuterRef("garden_id"))
+                Plant.objects.filter(garden_id__in=infested_ids).update(
+                    pest_damage=Subquery(garden.values("pest_severity")[:1]),
+                    version=Subquery(garden.values("version")[:1]),
+                    updated=now,
+                )
+                GardenCache.notify(infested_ids)
+            return len(infested_ids)
         except Exception as e:
-            raise Exception(f"Failed to check for pests: {str(e)}")
+            raise Exception(f"Failed to roll pests: {str(e)}")
 
-    @staticmethod
-    def process_user_activity(garden, activity_type):
+    ACTIVITY_EFFECTS = {
+        "transfer": {"growth": 0.2, "pest_resistance": 0.3},
+        # "swap": {"growth": 0.3, "pest_resistance": 0.2},
+        # "stake": {"growth": 0.4, "pest_resistance": 0.4},
+    }
+
+    @classmethod
+    def process_user_activity(cls, garden, activity_type):
         """Process blockchain activity effects"""
+        return cls.process_user_activities(garden, [activity_type])
+
+    @classmethod
+    def process_user_activities(cls, garden, activity_types):
+        """
+        Applies every activity detected for a garden in one poll at once.
+        Boosts are capped at 2.0, so summing them first gives the same
+        multiplier as applying them one by one; a matching activity cures
+        an infestation for good. Writes one garden and one plant UPDATE,
+        which also bump the garden's version and stamp it on the plants.
+        Returns the number of activities applied.
+        """
         try:
-            activities = {
-                "transfer": {"growth": 0.2, "pest_resistance": 0.3},
-                # "swap": {"growth": 0.3, "pest_resistance": 0.2},
-                # "stake": {"growth": 0.4, "pest_resistance": 0.4},
-            }
-            if activity_type in activities:
-                # Update activity timestamp
+            from .models import Garden
+
+            known_activities = [
+                activity_type
+                for activity_type in activity_types
+                if activity_type in cls.ACTIVITY_EFFECTS
+            ]
+            if not known_activities:
+                return 0
+            # Past ticks grew under the garden's previous pest state
+            cls.ensure_garden_current(garden)
+            with atomic():
+                # Work from the locked row, so an infestation rolled since
+                # the garden was read is neither lost nor wrongly cured
+                locked = Garden.objects.select_for_update().get(id=garden.id)
+                garden.pest_infestation = locked.pest_infestation
+                garden.pest_type = locked.pest_type
+                garden.pest_severity = locked.pest_severity
+                garden.total_onchain_actions = locked.total_onchain_actions
+                # Update activity timestamp and counters
                 garden.last_activity = timezone.now()
-                garden.total_onchain_actions += 1
-                # Check if this activity solves pest problem
+                garden.total_onchain_actions += len(known_activities)
+                garden.version = locked.version + 1
+                plant_updates = {
+                    "growth_multiplier": Least(
+                        Value(2.0),
+                        F("growth_multiplier")
+                        + sum(
+                            cls.ACTIVITY_EFFECTS[activity_type]["growth"]
+                            for activity_type in known_activities
+                        ),
+                    ),
+                    "updated": garden.last_activity,
+                    "version": garden.version,
+                }
+                # Check if any activity solves pest problem
                 if (
                     garden.pest_infestation
-                    and activity_type
-                    == GrowthService.PEST_TYPES[garden.pest_type]["solution"]
+                    and cls.PEST_TYPES[garden.pest_type]["solution"]
+                    in known_activities
                 ):
                     garden.pest_infestation = False
                     garden.pest_type = None
                     garden.pest_severity = 0
                     # Heal plants
-                    for plant in garden.plants.all():
-                        plant.pest_damage = 0
-                        plant.save()
-                # Apply growth boost to plants
-                boost = activities[activity_type]["growth"]
-                for plant in garden.plants.all():
-                    plant.growth_multiplier = min(2.0, plant.growth_multiplier + boost)
-                    plant.save()
-                garden.save()
+                    plant_updates["pest_damage"] = 0
+                garden.save(
+                    update_fields=[
+                        "last_activity",
+                        "total_onchain_actions",
+                        "pest_infestation",
+                        "pest_type",
+                        "pest_severity",
+                        "version",
+                        "updated",
+                    ]
+                )
+                garden.plants.update(**plant_updates)
+                GardenCache.notify([garden.id])
+            return len(known_activities)
         except Exception as e:
             raise Exception(f"Failed to process user activity: {str(e)}")
 
@@ -151,27 +308,997 @@ class GrowthService:
         except Exception as e:
             raise Exception(f"Failed to update plant health: {str(e)}")
 
+    @staticmethod
+    def calculate_growth_batch(columns, weather):
+        """
+        Vectorized equivalent of calculate_growth, update_plant_health and
+        update_plant_stage for a batch of plants held in columnar arrays.
+        The scalar methods remain the reference implementation; every
+        operation here is applied in the same order so results match them
+        exactly. Returns the new growth_progress, health and stage code arrays.
+        """
+        try:
+            weather_type = weather.weather_type
+            health = columns["health"]
+            stage = columns["stage"]
+            # Growth uses the health and stage from before this cycle
+            pest_reduction = np.where(
+                columns["pest_infestation"],
+                np.maximum(0.1, 1 - (columns["pest_damage"] / 100)),
+                1.0,
+            )
+            growth = (
+                columns["growth_rate"]
+                * GrowthService.BASE_GROWTH_RATE
+                * GrowthService.WEATHER_GROWTH_MULTIPLIERS.get(weather_type, 1.0)
+                * (columns["soil_quality"] / 100)
+                * (health / 100)
+                * pest_reduction
+            )
+            growth_progress = np.minimum(100, columns["growth_progress"] + growth)
+            # Health changes
+            health_change = np.zeros_like(health)
+            if weather_type == "stormy":
+                health_change -= 5
+            elif weather_type == "sunny" and weather.temperature > 35:
+                health_change -= 2
+            elif weather_type == "rainy":
+                health_change -= np.where(
+                    stage >= GrowthService.GROWTH_STAGES.index("flowering"), 3, 0
+                )
+            health_change -= np.where(
+                columns["soil_quality"] < columns["required_soil_quality"], 2, 0
+            )
+            health = np.clip(health + health_change, 0, 100)
+            # Stages only move once the plant has sprouted
+            stage = np.where(
+                growth_progress >= GrowthService.STAGE_THRESHOLDS[0],
+                np.searchsorted(
+                    GrowthService.STAGE_THRESHOLDS, growth_progress, side="right"
+                ),
+                stage,
+            )
+            return growth_progress, health, stage
+        except Exception as e:
+            raise Exception(f"Failed to calculate batch growth: {str(e)}")
+
+    @classmethod
+    def advance_growth_batch(cls, columns, weather, ticks):
+        """
+        Advances a batch of plants by several ticks of unchanging weather in
+        one step. Health only ever falls by a fixed amount per tick, so the
+        health each tick grows with is an arithmetic sequence clamped at zero
+        and the total growth is its closed-form sum. Plants that would be
+        harvested mid-run, or reach flowering under rain (which changes their
+        health penalty), are replayed tick by tick instead. Agrees with
+        per-tick replay up to floating-point rounding.
+        Returns the new growth_progress, health and stage code arrays.
+        """
+        try:
+            if ticks == 1:
+                return cls.calculate_growth_batch(columns, weather)
+            weather_type = weather.weather_type
+            flowering = cls.GROWTH_STAGES.index("flowering")
+            harvest = cls.GROWTH_STAGES.index("harvest")
+            health = columns["health"]
+            stage = columns["stage"]
+            pest_reduction = np.where(
+                columns["pest_infestation"],
+                np.maximum(0.1, 1 - (columns["pest_damage"] / 100)),
+                1.0,
+            )
+            growth_per_health = (
+                columns["growth_rate"]
+                * cls.BASE_GROWTH_RATE
+                * cls.WEATHER_GROWTH_MULTIPLIERS.get(weather_type, 1.0)
+                * (columns["soil_quality"] / 100)
+                * pest_reduction
+                / 100
+            )
+            health_change = np.zeros_like(health)
+            if weather_type == "stormy":
+                health_change -= 5
+            elif weather_type == "sunny" and weather.temperature > 35:
+                health_change -= 2
+            elif weather_type == "rainy":
+                health_change -= np.where(stage >= flowering, 3, 0)
+            health_change -= np.where(
+                columns["soil_quality"] < columns["required_soil_quality"], 2, 0
+            )
+            # Ticks that still grow before health runs out, and their health sum
+            healthy_ticks = np.full_like(health, ticks)
+            falling = health_change < 0
+            healthy_ticks[falling] = np.minimum(
+                ticks, -(-health[falling] // -health_change[falling])
+            )
+            health_sum = (
+                healthy_ticks * health
+                + health_change * healthy_ticks * (healthy_ticks - 1) // 2
+            )
+            growth_progress = np.minimum(
+                100, columns["growth_progress"] + growth_per_health * health_sum
+            )
+            health = np.clip(health + ticks * health_change, 0, 100)
+            stage = np.where(
+                growth_progress >= cls.STAGE_THRESHOLDS[0],
+                np.searchsorted(cls.STAGE_THRESHOLDS, growth_progress, side="right"),
+                stage,
+            )
+            # Plants the closed form does not describe
+            replay = growth_progress >= 100
+            if weather_type == "rainy":
+                replay |= (columns["stage"] < flowering) & (growth_progress >= 80)
+                replay |= (columns["stage"] >= flowering) & (
+                    columns["growth_progress"] < 80
+                )
+            if replay.any():
+                replayed = {name: values[replay] for name, values in columns.items()}
+                for _ in range(ticks):
+                    growing = replayed["stage"] != harvest
+                    if not growing.any():
+                        break
+                    grown = cls.calculate_growth_batch(replayed, weather)
+                    replayed = dict(
+                        replayed,
+                        growth_progress=np.where(
+                            growing, grown[0], replayed["growth_progress"]
+                        ),
+                        health=np.where(growing, grown[1], replayed["health"]),
+                        stage=np.where(growing, grown[2], replayed["stage"]),
+                    )
+                growth_progress[replay] = replayed["growth_progress"]
+                health[replay] = replayed["health"]
+                stage[replay] = replayed["stage"]
+            return growth_progress, health, stage
+        except Exception as e:
+            raise Exception(f"Failed to advance batch growth: {str(e)}")
+
+    @classmethod
+    def advance_growth_timeline(cls, columns, plant_ticks, timeline):
+        """
+        Advances a batch of plants through a weather timeline.
+        Consecutive ticks with the same growth conditions are applied as one
+        closed-form step; plant_ticks holds the last tick each plant has
+        already been grown for. Returns the new growth_progress, health and
+        stage code arrays.
+        """
+        harvest = cls.GROWTH_STAGES.index("harvest")
+        growth_progress = columns["growth_progress"].copy()
+        health = columns["health"].copy()
+        stage = columns["stage"].copy()
+        # Split runs wherever the weather or the set of pending plants changes
+        first_pending_ticks = set((plant_ticks + 1).tolist())
+        runs = []
+        for tick, weather in timeline:
+            conditions = weather and (
+                weather.weather_type,
+                weather.weather_type == "sunny" and weather.temperature > 35,
+            )
+            if runs and runs[-1][1] == conditions and tick not in first_pending_ticks:
+                runs[-1][2] += 1
+            else:
+                runs.append([tick, conditions, 1, weather])
+        for first_tick, conditions, length, weather in runs:
+            if not conditions:
+                continue
+            pending = (plant_ticks < first_tick) & (stage != harvest)
+            if not pending.any():
+                continue
+            run_columns = {name: values[pending] for name, values in columns.items()}
+            run_columns.update(
+                growth_progress=growth_progress[pending],
+                health=health[pending],
+                stage=stage[pending],
+            )
+            grown = cls.advance_growth_batch(run_columns, weather, length)
+            growth_progress[pending] = grown[0]
+            health[pending] = grown[1]
+            stage[pending] = grown[2]
+        return growth_progress, health, stage
+
+    @classmethod
+    def _build_growth_columns(cls, rows):
+        """Converts GROWTH_READ_FIELDS rows into the kernel's columnar arrays"""
+        (
+            _,
+            growth_stage,
+            health,
+            growth_progress,
+            pest_damage,
+            soil_quality,
+            pest_infestation,
+            plant_type_ids,
+        ) = zip(*rows)
+        stage_codes = {stage: code for code, stage in enumerate(cls.GROWTH_STAGES)}
+        # Plant type attributes come from the in-memory catalog, not a join
+        type_ids, type_index = np.unique(plant_type_ids, return_inverse=True)
+        records = [PlantCatalog.get_record(type_id) for type_id in type_ids]
+        for type_id, record in zip(type_ids, records):
+            if record is None:
+                raise Exception(f"Unknown plant type: {type_id}")
+        growth_rate = np.array([record.growth_rate for record in records])[type_index]
+        required_soil_quality = np.array(
+            [record.required_soil_quality for record in records]
+        )[type_index]
+        return {
+            "growth_rate": np.array(growth_rate, dtype=np.float64),
+            "soil_quality": np.array(soil_quality, dtype=np.int64),
+            "health": np.array(health, dtype=np.int64),
+            "pest_damage": np.array(pest_damage, dtype=np.int64),
+            "pest_infestation": np.array(pest_infestation, dtype=bool),
+            "stage": np.array([stage_codes[stage] for stage in growth_stage]),
+            "required_soil_quality": np.array(required_soil_quality, dtype=np.int64),
+            "growth_progress": np.array(growth_progress, dtype=np.float64),
+        }
+
+    @classmethod
+    def _write_growth(
+        cls, plant_ids, garden_ids, columns, grown, tick, batch_size=None
+    ):
+        """
+        Writes a grown batch back for a tick. Changed plants get their new
+        values and their garden's new version; unchanged plants only get
+        the tick, so versions (and cached responses) only move for gardens
+        where something changed. The caller holds the gardens' row locks.
+        Plants a newer tick has already reached, for instance from an
+        overlapping cycle, are left alone. Returns the number of plants
+        rewritten.
+        """
+        from .models import Plant
+
+        behind = Plant.objects.filter(growth_tick__lt=tick)
+
+        growth_progress, health, stage = grown
+        changed = (
+            (growth_progress != columns["growth_progress"])
+            | (health != columns["health"])
+            | (stage != columns["stage"])
+        )
+        unchanged_ids = [plant_ids[index] for index in np.flatnonzero(~changed)]
+        if unchanged_ids:
+            behind.filter(id__in=unchanged_ids).update(growth_tick=tick)
+        changed = np.flatnonzero(changed)
+        if not len(changed):
+            return 0
+        # New versions go out with the growth in one plant write
+        versions = GardenCache.bump_versions({garden_ids[index] for index in changed})
+        now = timezone.now()
+        return behind.bulk_update(
+            [
+                Plant(
+                    id=plant_ids[index],
+                    growth_progress=float(growth_progress[index]),
+                    health=int(health[index]),
+                    growth_stage=cls.GROWTH_STAGES[stage[index]],
+                    growth_tick=tick,
+                    updated=now,
+                    version=versions[garden_ids[index]],
+                )
+                for index in changed
+            ],
+            cls.GROWTH_WRITE_FIELDS,
+            batch_size=batch_size,
+        )
+
+    @staticmethod
+    def get_current_weather():
+        """Returns the weather growth cycles run under, if recent enough"""
+        weather = WeatherSnapshot.get()
+        if weather and weather.timestamp >= timezone.now() - timedelta(minutes=30):
+            return weather
+        return None
+
+    @staticmethod
+    def get_weather_timeline(first_tick, last_tick):
+        """
+        Rebuilds the weather each growth tick ran under from the WeatherState
+        log. A tick grows under the newest state recorded before it ended, if
+        that state is at most 30 minutes old, just as process_growth_cycle
+        would have seen it. Returns (tick, weather) pairs, with None for
+        ticks that had no usable weather. Periods whose raw states were
+        already pruned fall back to the minute WeatherRollup rows.
+        """
+        try:
+            tick_seconds = settings.GARDEN["GROWTH_TICK_SECONDS"]
+            max_age = timedelta(minutes=30)
+            now = timezone.now()
+            tick_ends = [
+                min(
+                    now,
+                    datetime.fromtimestamp(
+                        (tick + 1) * tick_seconds, tz=dt_timezone.utc
+                    ),
+                )
+                for tick in range(first_tick, last_tick + 1)
+            ]
+            if not tick_ends:
+                return []
+            states = list(
+                WeatherState.objects.filter(
+                    timestamp__gte=tick_ends[0] - max_age,
+                    timestamp__lte=tick_ends[-1],
+                )
+                .order_by("timestamp")
+                .only("timestamp", "weather_type", "temperature")
+            )
+            rollups = WeatherRollup.objects.filter(
+                resolution="minute",
+                bucket__gte=tick_ends[0] - max_age,
+                bucket__lt=states[0].timestamp if states else tick_ends[-1],
+            ).order_by("bucket")
+            states = [
+                WeatherState(
+                    timestamp=rollup.bucket,
+                    weather_type=rollup.weather_type,
+                    temperature=rollup.temperature,
+                )
+                for rollup in rollups
+            ] + states
+            timestamps = [state.timestamp for state in states]
+            timeline = []
+            for tick, tick_end in zip(range(first_tick, last_tick + 1), tick_ends):
+                index = bisect_right(timestamps, tick_end) - 1
+                weather = None
+                if index >= 0 and timestamps[index] >= tick_end - max_age:
+                    weather = states[index]
+                timeline.append((tick, weather))
+            return timeline
+        except Exception as e:
+            raise Exception(f"Failed to build weather timeline: {str(e)}")
+
     @classmethod
-    def process_growth_cycle(cls):
-        """Process growth for all plants"""
+    def materialize_gardens(cls, garden_ids, tick=None):
+        """
+        Applies every growth tick the plants in the given gardens have missed,
+        up to MAX_CATCH_UP_TICKS, replaying the recorded weather in
+        closed-form runs. Plants the catch-up changed are written back once
+        and version their gardens; the rest only get the tick.
+        Gardens are locked while they are materialized so concurrent reads
+        never apply a tick twice. Returns the number of plants changed.
+        """
+        try:
+            from .models import Garden, Plant
+
+            tick = tick or get_growth_tick()
+            with atomic():
+                garden_ids = list(
+                    Garden.objects.select_for_update()
+                    .filter(id__in=garden_ids, growth_tick__lt=tick)
+                    .order_by("id")
+                    .values_list("id", flat=True)
+                )
+                if not garden_ids:
+                    return 0
+                rows = list(
+                    Plant.objects.active()
+                    .filter(garden_id__in=garden_ids, growth_tick__lt=tick)
+                    .values_list(*cls.GROWTH_READ_FIELDS, "garden_id", "growth_tick")
+                )
+                changed = 0
+                if rows:
+                    columns = cls._build_growth_columns([row[:-2] for row in rows])
+                    plant_ticks = np.array([row[-1] for row in rows])
+                    timeline = cls.get_weather_timeline(
+                        max(
+                            int(plant_ticks.min()) + 1,
+                            tick - settings.GARDEN["MAX_CATCH_UP_TICKS"] + 1,
+                        ),
+                        tick,
+                    )
+                    grown = cls.advance_growth_timeline(columns, plant_ticks, timeline)
+                    changed = cls._write_growth(
+                        [row[0] for row in rows],
+                        [row[-2] for row in rows],
+                        columns,
+                        grown,
+                        tick,
+                        batch_size=settings.GARDEN["GROWTH_CHUNK_SIZE"],
+                    )
+                Garden.objects.filter(id__in=garden_ids).update(growth_tick=tick)
+                return changed
+        except Exception as e:
+            raise Exception(f"Failed to materialize gardens: {str(e)}")
+
+    @classmethod
+    def ensure_garden_current(cls, garden):
+        """Materializes a garden's pending growth when growth runs lazily"""
+        if settings.GARDEN["GROWTH_MODE"] == "lazy":
+            tick = get_growth_tick()
+            cls.materialize_gardens([garden.id], tick)
+            # Keep a later garden.save() from rolling the marker back
+            garden.growth_tick = max(garden.growth_tick, tick)
+
+    @classmethod
+    def catch_up_growth(cls, tick=None, garden_range=None):
+        """
+        Brings every garden with plants behind the given tick up to it, so
+        ticks missed while workers or the scheduler were down are not lost.
+        Returns the number of plants written.
+        """
         try:
             from .models import Plant
 
-            current_weather = WeatherState.objects.filter(
-                timestamp__gte=timezone.now() - timedelta(minutes=30)
-            ).first()
+            tick = tick or get_growth_tick()
+            behind = Plant.objects.active().filter(growth_tick__lt=tick)
+            if garden_range:
+                lower, upper = garden_range
+                if lower is not None:
+                    behind = behind.filter(garden_id__gte=lower)
+                if upper is not None:
+                    behind = behind.filter(garden_id__lt=upper)
+            garden_ids = (
+                behind.order_by("garden_id")
+                .values_list("garden_id", flat=True)
+                .distinct()
+            )
+            chunk_size = settings.GARDEN["GROWTH_CHUNK_SIZE"]
+            plants_written = 0
+            last_id = None
+            while True:
+                page = garden_ids
+                if last_id is not None:
+                    page = garden_ids.filter(garden_id__gt=last_id)
+                chunk = list(page[:chunk_size])
+                if not chunk:
+                    break
+                last_id = chunk[-1]
+                plants_written += cls.materialize_gardens(chunk, tick)
+            return plants_written
+        except Exception as e:
+            raise Exception(f"Failed to catch up growth: {str(e)}")
+
+    @staticmethod
+    def get_shard_ranges(shards):
+        """
+        Splits gardens into contiguous Garden.id ranges of similar size.
+        Returns a list of (lower, upper) bounds, lower inclusive and upper
+        exclusive, where None leaves that side of the range open.
+        """
+        try:
+            from .models import Garden
+
+            garden_ids = Garden.objects.order_by("id").values_list("id", flat=True)
+            garden_count = garden_ids.count()
+            boundaries = []
+            for shard in range(1, shards):
+                offset = shard * garden_count // shards
+                boundary = list(garden_ids[offset : offset + 1])
+                if boundary and boundary[0] not in boundaries:
+                    boundaries.append(boundary[0])
+            bounds = [None, *boundaries, None]
+            return list(zip(bounds[:-1], bounds[1:]))
+        except Exception as e:
+            raise Exception(f"Failed to calculate shard ranges: {str(e)}")
+
+    @classmethod
+    def _process_growth_cycle_sql(cls, tick, weather, garden_range, stats):
+        """
+        Runs one growth tick as a single set-based UPDATE in PostgreSQL.
+        Every grown plant is stamped with the tick; only changed plants get
+        a new updated time and version, and only their gardens are bumped.
+        The CASE expressions are generated from the same multiplier and
+        threshold tables the Python engine uses, and every arithmetic step
+        keeps the scalar rules' order so both engines produce equal rows.
+        """
+        from .models import Garden, Plant, PlantType
+
+        if connection.vendor != "postgresql":
+            raise Exception("The sql growth engine requires PostgreSQL")
+        params = {
+            "tick": tick,
+            "now": timezone.now(),
+            "weather_type": weather.weather_type,
+            "temperature": weather.temperature,
+            "base_growth_rate": cls.BASE_GROWTH_RATE,
+        }
+        weather_cases = []
+        for index, (weather_type, multiplier) in enumerate(
+            cls.WEATHER_GROWTH_MULTIPLIERS.items()
+        ):
+            params[f"weather_{index}"] = weather_type
+            params[f"multiplier_{index}"] = multiplier
+            weather_cases.append(
+                f"WHEN %(weather_{index})s "
+                f"THEN %(multiplier_{index})s::double precision"
+            )
+        stage_cases = []
+        for threshold, stage in reversed(
+            list(zip(cls.STAGE_THRESHOLDS, cls.GROWTH_STAGES[1:]))
+        ):
+            params[f"threshold_{stage}"] = threshold
+            params[f"stage_{stage}"] = stage
+            stage_cases.append(
+                f"WHEN grown.growth_progress >= %(threshold_{stage})s "
+                f"THEN %(stage_{stage})s"
+            )
+        range_filter = ""
+        if garden_range:
+            lower, upper = garden_range
+            if lower is not None:
+                params["lower"] = lower
+                range_filter += " AND p.garden_id >= %(lower)s"
+            if upper is not None:
+                params["upper"] = upper
+                range_filter += " AND p.garden_id < %(upper)s"
+        query = f"""
+            WITH grown AS (
+                SELECT
+                    p.id,
+                    LEAST(
+                        100,
+                        p.growth_progress + (
+                            pt.growth_rate
+                            * %(base_growth_rate)s::double precision
+                            * CASE %(weather_type)s {" ".join(weather_cases)}
+                                ELSE 1.0::double precision END
+                            * (g.soil_quality::double precision / 100)
+                            * (p.health::double precision / 100)
+                            * CASE WHEN g.pest_infestation
+                                THEN GREATEST(
+                                    0.1::double precision,
+                                    1 - (p.pest_damage::double precision / 100)
+                                )
+                                ELSE 1.0::double precision END
+                        )
+                    ) AS growth_progress,
+                    GREATEST(0, LEAST(100, p.health
+                        + CASE
+                            WHEN %(weather_type)s = 'stormy' THEN -5
+                            WHEN %(weather_type)s = 'sunny'
+                                AND %(temperature)s::double precision > 35 THEN -2
+                            WHEN %(weather_type)s = 'rainy'
+                                AND p.growth_stage IN ('flowering', 'harvest')
+                                THEN -3
+                            ELSE 0 END
+                        + CASE WHEN g.soil_quality < pt.required_soil_quality
+                            THEN -2 ELSE 0 END
+                    )) AS health,
+                    p.growth_stage
+                FROM {Plant._meta.db_table} p
+                JOIN {Garden._meta.db_table} g ON g.id = p.garden_id
+                JOIN {PlantType._meta.db_table} pt ON pt.id = p.plant_type_id
+                WHERE p.health > 0
+                    AND NOT p.growth_stage = 'harvest'
+                    AND p.growth_tick < %(tick)s{range_filter}
+            ),
+            staged AS (
+                SELECT
+                    grown.id,
+                    grown.growth_progress,
+                    grown.health,
+                    CASE {" ".join(stage_cases)}
+                        ELSE grown.growth_stage END AS growth_stage
+                FROM grown
+            ),
+            compared AS (
+                SELECT
+                    staged.*,
+                    plant.garden_id,
+                    (staged.growth_progress, staged.health, staged.growth_stage)
+                        IS DISTINCT FROM
+                        (plant.growth_progress, plant.health, plant.growth_stage)
+                        AS changed
+                FROM staged
+                JOIN {Plant._meta.db_table} plant ON plant.id = staged.id
+            ),
+            bumped AS (
+                UPDATE {Garden._meta.db_table} garden
+                SET version = garden.version + 1
+                WHERE garden.id IN (SELECT garden_id FROM compared WHERE changed)
+                RETURNING garden.id, garden.version
+            ),
+            updated AS (
+                UPDATE {Plant._meta.db_table} plant
+                SET
+                    growth_progress = compared.growth_progress,
+                    health = compared.health,
+                    growth_stage = compared.growth_stage,
+                    growth_tick = %(tick)s,
+                    updated = CASE WHEN compared.changed
+                        THEN %(now)s ELSE plant.updated END,
+                    version = CASE WHEN compared.changed
+                        THEN bumped.version ELSE plant.version END
+                FROM compared
+                LEFT JOIN bumped ON bumped.id = compared.garden_id
+                WHERE plant.id = compared.id
+                RETURNING plant.garden_id, compared.changed
+            )
+            SELECT garden_id, COUNT(*) FROM updated WHERE changed GROUP BY garden_id
+        """
+        behind = Plant.objects.active().filter(growth_tick__lt=tick)
+        if garden_range:
+            lower, upper = garden_range
+            if lower is not None:
+                behind = behind.filter(garden_id__gte=lower)
+            if upper is not None:
+                behind = behind.filter(garden_id__lt=upper)
+        phase_start = time.perf_counter()
+        with atomic(), connection.cursor() as cursor:
+            # Gardens are locked before their plants, in id order, like
+            # every other garden writer, so the tick cannot deadlock them
+            list(
+                Garden.objects.select_for_update()
+                .filter(id__in=behind.values("garden_id"))
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+            cursor.execute(query, params)
+            updated_gardens = cursor.fetchall()
+            stats["plants_updated"] = sum(count for _, count in updated_gardens)
+            # The statement bumped the gardens and stamped their plants itself
+            GardenCache.notify([garden_id for garden_id, _ in updated_gardens])
+        stats["chunks"] = 1
+        stats["timings"]["write"] = time.perf_counter() - phase_start
+        return stats
+
+    @classmethod
+    def process_growth_cycle(
+        cls, tick=None, weather=None, garden_range=None, engine=None
+    ):
+        """
+        Process growth for all plants, or for the gardens in garden_range.
+        The python engine streams plants in keyset-paginated chunks so memory
+        stays flat, and writes each chunk back with a single bulk update; the
+        sql engine runs the whole tick inside PostgreSQL.
+        Plants already grown for this tick are skipped, so a retried run only
+        finishes the chunks that did not commit. Returns the cycle statistics.
+        """
+        try:
+            from .models import Garden, Plant
+
+            stats = {
+                "plants_updated": 0,
+                "chunks": 0,
+                "timings": {"fetch": 0.0, "compute": 0.0, "write": 0.0},
+            }
+            tick = tick or get_growth_tick()
+            current_weather = weather or cls.get_current_weather()
             if not current_weather:
-                return
-            for plant in Plant.objects.select_related("garden", "plant_type"):
-                if plant.growth_stage != "harvest":
-                    # Calculate and apply growth
-                    growth = cls.calculate_growth(plant, current_weather)
-                    plant.growth_progress = min(100, plant.growth_progress + growth)
-                    # Update health
-                    cls.update_plant_health(plant, current_weather)
-                    # Update stage
-                    cls.update_plant_stage(plant)
-                    plant.last_updated = timezone.now()
-                    plant.save()
+                return stats
+            # Replay any ticks missed before this one
+            stats["plants_caught_up"] = cls.catch_up_growth(tick - 1, garden_range)
+            engine = engine or settings.GARDEN["GROWTH_ENGINE"]
+            if engine == "sql":
+                return cls._process_growth_cycle_sql(
+                    tick, current_weather, garden_range, stats
+                )
+            if engine != "python":
+                raise Exception(f"Unknown growth engine: {engine}")
+            chunk_size = settings.GARDEN["GROWTH_CHUNK_SIZE"]
+            # Only plants that can still change are read
+            plants = Plant.objects.active().filter(growth_tick__lt=tick)
+            if garden_range:
+                lower, upper = garden_range
+                if lower is not None:
+                    plants = plants.filter(garden_id__gte=lower)
+                if upper is not None:
+                    plants = plants.filter(garden_id__lt=upper)
+            plants = plants.order_by("id").values_list(
+                *cls.GROWTH_READ_FIELDS, "garden_id"
+            )
+            last_id = None
+            while True:
+                phase_start = time.perf_counter()
+                page = plants.filter(id__gt=last_id) if last_id else plants
+                rows = list(page[:chunk_size])
+                stats["timings"]["fetch"] += time.perf_counter() - phase_start
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                stats["chunks"] += 1
+                # Calculate growth, health and stage for the whole chunk
+                phase_start = time.perf_counter()
+                columns = cls._build_growth_columns([row[:-1] for row in rows])
+                grown = cls.calculate_growth_batch(columns, current_weather)
+                stats["timings"]["compute"] += time.perf_counter() - phase_start
+                # Every plant read is stamped with the tick; only changed
+                # rows are rewritten and version their gardens
+                phase_start = time.perf_counter()
+                garden_ids = [row[-1] for row in rows]
+                with atomic():
+                    # Lock the chunk's gardens before their plants, in id
+                    # order, as activities and pests do
+                    list(
+                        Garden.objects.select_for_update()
+                        .filter(id__in=set(garden_ids))
+                        .order_by("id")
+                        .values_list("id", flat=True)
+                    )
+                    stats["plants_updated"] += cls._write_growth(
+                        [row[0] for row in rows], garden_ids, columns, grown, tick
+                    )
+                stats["timings"]["write"] += time.perf_counter() - phase_start
+            return stats
         except Exception as e:
             raise Exception(f"Failed to process growth cycle: {str(e)}")
+
+
+class GardenCache:
+    """
+    Pre-rendered garden responses, cached per (garden, version).
+    Every write to a garden or its plants bumps Garden.version, through
+    bump or in the writer's own UPDATE, so cached responses never need
+    explicit invalidation: a new version simply maps to a new key, and old
+    keys expire. Bumps are also published for the garden event streams,
+    by bump or notify.
+    """
+
+    RESPONSE_KEY = "garden:response:{view}:{garden_id}:{version}"
+
+    @staticmethod
+    def bump(garden_ids, plants=None):
+        """
+        Increments the version of every given garden, and stamps the plants
+        queryset (the plants that changed) with their garden's new version.
+        """
+        from .models import Garden
+
+        garden_ids = list(garden_ids)
+        if not garden_ids:
+            return 0
+        bumped = Garden.objects.filter(id__in=garden_ids).update(
+            version=F("version") + 1
+        )
+        if plants is not None:
+            plants.update(
+                version=Subquery(
+                    Garden.objects.filter(id=OuterRef("garden_id")).values(
+                        "version"
+                    )[:1]
+                )
+            )
+        GardenCache.notify(garden_ids)
+        return bumped
+
+    @staticmethod
+    def notify(garden_ids):
+        """
+        Publishes the gardens once the transaction commits, for writers that
+        bump Garden.version in their own UPDATE instead of through bump.
+        """
+        garden_ids = list(garden_ids)
+        if garden_ids:
+            # Open event streams are told once the change is visible
+            on_commit(
+                lambda: GardenCache.publish({"gardens": garden_ids}), robust=True
+            )
+
+    @staticmethod
+    def bump_versions(garden_ids):
+        """
+        Bumps the given gardens and returns their new versions by id, for
+        writers that stamp Plant.version in their own plant UPDATE. The
+        caller holds the gardens' row locks.
+        """
+        from .models import Garden
+
+        garden_ids = list(garden_ids)
+        GardenCache.bump(garden_ids)
+        return dict(
+            Garden.objects.filter(id__in=garden_ids).values_list("id", "version")
+        )
+
+    @staticmethod
+    def publish(event):
+        """Announces a change to every process streaming garden events"""
+        get_redis_connection("default").publish(
+            settings.GARDEN_EVENTS["CHANNEL"], json.dumps(event)
+        )
+
+    @staticmethod
+    def get_current_version(**filters):
+        """
+        Returns (garden_id, version) for the matching garden, or None.
+        One query when the garden is current; in lazy mode, pending growth
+        is materialized first so the version covers it.
+        """
+        from .models import Garden
+
+        state = (
+            Garden.objects.filter(**filters)
+            .values_list("id", "version", "growth_tick")
+            .first()
+        )
+        if state is None:
+            return None
+        garden_id, version, growth_tick = state
+        if settings.GARDEN["GROWTH_MODE"] == "lazy":
+            tick = get_growth_tick()
+            if growth_tick < tick and GrowthService.materialize_gardens(
+                [garden_id], tick
+            ):
+                version = (
+                    Garden.objects.filter(id=garden_id)
+                    .values_list("version", flat=True)
+                    .first()
+                )
+        return garden_id, version
+
+    @classmethod
+    def get_key(cls, view, garden_id, version):
+        """Cache key of one view's response for a garden version"""
+        return cls.RESPONSE_KEY.format(
+            view=view, garden_id=garden_id, version=version
+        )
+
+    @staticmethod
+    def get_response(key):
+        """Returns cached response bytes, or None on a miss"""
+        return cache.get(key)
+
+    @staticmethod
+    def set_response(key, content):
+        """Caches response bytes until they expire or the version moves on"""
+        cache.set(key, content, settings.GARDEN_RESPONSE_CACHE_TTL)
+
+
+class TombstoneService:
+    """
+    Retention of PlantTombstone rows. Each garden remembers the newest
+    version it pruned as its tombstone floor, below which delta reads can
+    no longer list removals and fall back to the whole garden.
+    """
+
+    @staticmethod
+    def prune(now=None):
+        """Deletes expired tombstones, returning the number deleted"""
+        try:
+            from .models import Garden, PlantTombstone
+
+            cutoff = (now or timezone.now()) - timedelta(
+                days=settings.GARDEN["TOMBSTONE_RETENTION_DAYS"]
+            )
+            expired = PlantTombstone.objects.filter(created__lt=cutoff)
+            with atomic():
+                # Raise the floors before the tombstones disappear
+                Garden.objects.filter(id__in=expired.values("garden_id")).update(
+                    tombstone_floor=Greatest(
+                        F("tombstone_floor"),
+                        Subquery(
+                            expired.filter(garden_id=OuterRef("id"))
+                            .values("garden_id")
+                            .annotate(floor=Max("version"))
+                            .values("floor")[:1]
+                        ),
+                    )
+                )
+                deleted, _ = expired.delete()
+            return deleted
+        except Exception as e:
+            raise Exception(f"Failed to prune plant tombstones: {str(e)}")
+
+
+class GardenEventTicket:
+    """
+    Short-lived, single-use tickets for opening a garden event stream.
+    EventSource cannot send headers, so browsers pass a ticket in the URL
+    instead of the auth token; a logged URL is worthless once the stream
+    has opened or TICKET_TTL has passed.
+    """
+
+    KEY = "garden:events:ticket:{ticket}"
+
+    @classmethod
+    def issue(cls, user):
+        """Returns a new ticket for the user's garden stream"""
+        ticket = generate_hex_token()
+        cache.set(
+            cls.KEY.format(ticket=ticket),
+            user.id,
+            settings.GARDEN_EVENTS["TICKET_TTL"],
+        )
+        return ticket
+
+    @classmethod
+    def redeem(cls, ticket):
+        """Voids a ticket and returns its user's id, or None if not valid"""
+        key = cls.KEY.format(ticket=ticket)
+        user_id = cache.get(key)
+        # Of concurrent redemptions, only the one whose delete removed the
+        # ticket may use it
+        if user_id is None or not cache.delete(key):
+            return None
+        return user_id
+
+
+PlantTypeRecord = namedtuple(
+    "PlantTypeRecord",
+    [
+        "id",
+        "name",
+        "growth_rate",
+        "max_health",
+        "required_soil_quality",
+        "description",
+        "created",
+    ],
+)
+
+
+class PlantCatalog:
+    """
+    Process-local copy of the PlantType table: immutable records by id,
+    each type's serialized form, and the rendered PlantTypeView response
+    with its ETag. Admin edits bump a shared version key; processes compare
+    their copy with it every PLANT_CATALOG_LOCAL_TTL seconds.
+    """
+
+    VERSION_KEY = "garden:plant_types:version"
+    _local = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self, version, plant_types):
+        from base.renderers import ORJSONRenderer
+        from .serializers import PlantTypeSerializer
+
+        self.version = version
+        serialized = PlantTypeSerializer(plant_types, many=True).data
+        self.records = MappingProxyType(
+            {
+                plant_type.id: PlantTypeRecord(
+                    *(getattr(plant_type, field) for field in PlantTypeRecord._fields)
+                )
+                for plant_type in plant_types
+            }
+        )
+        self.serialized = MappingProxyType({data["id"]: data for data in serialized})
+        self.content = ORJSONRenderer().render(
+            {"status": "success", "data": {"plant_types_data": serialized}}
+        )
+        self.etag = f'"plant-types-{version}"'
+
+    @classmethod
+    def _get_version(cls):
+        cache.add(cls.VERSION_KEY, 0, timeout=None)
+        return cache.get(cls.VERSION_KEY, 0)
+
+    @classmethod
+    def get(cls, refresh=False):
+        """
+        Returns the current catalog, rebuilding it when types changed.
+        refresh rebuilds it from the database whatever the shared version.
+        """
+        try:
+            from .models import PlantType
+
+            now = time.monotonic()
+            local = cls._local
+            if (
+                local is not None
+                and not refresh
+                and now - cls._checked_at < settings.PLANT_CATALOG_LOCAL_TTL
+            ):
+                return local
+            version = cls._get_version()
+            if refresh or local is None or local.version != version:
+                with cls._lock:
+                    local = cls(version, list(PlantType.objects.all()))
+                    cls._local = local
+            cls._checked_at = now
+            return local
+        except Exception as e:
+            raise Exception(f"Failed to load plant catalog: {str(e)}")
+
+    @classmethod
+    def get_record(cls, plant_type_id):
+        """Returns a type's record, reloading once if it is not known yet"""
+        record = cls.get().records.get(plant_type_id)
+        if record is None:
+            record = cls.get(refresh=True).records.get(plant_type_id)
+        return record
+
+    @classmethod
+    def get_serialized(cls, plant_type_id):
+        """Returns a copy of a type's PlantTypeSerializer output"""
+        data = cls.get().serialized.get(plant_type_id)
+        if data is None:
+            data = cls.get(refresh=True).serialized[plant_type_id]
+        return dict(data)
+
+    @classmethod
+    def invalidate(cls):
+        """Makes every process rebuild its catalog on its next check"""
+        cache.add(cls.VERSION_KEY, 0, timeout=None)
+        cache.incr(cls.VERSION_KEY)
+        cls._local = None
@@ -1,19 +1,156 @@
-from celery import shared_task
+from celery import shared_task, chord
+from django.conf import settings
 from django.utils import timezone
-from .services import GrowthService
+from blockchain.models import WeatherState
+from base.utils import get_growth_tick
+from .services import GrowthService, TombstoneService
 
 
 @shared_task(max_retries=5)
 def process_garden_updates():
-    """Process growth updates for all plants."""
+    """
+    Process growth updates for all plants.
+    With more than one configured shard, gardens are split into Garden.id
+    ranges and processed in parallel by process_garden_shard tasks.
+    """
     try:
         start_time = timezone.now()
-        plants_updated = GrowthService.process_growth_cycle()
+        if settings.GARDEN["GROWTH_MODE"] == "lazy":
+            # Plants are grown when their garden is read or touched instead
+            return {"status": "skipped", "mode": "lazy", "plants_updated": 0}
+        shards = settings.GARDEN["GROWTH_SHARDS"]
+        if shards > 1:
+            tick = get_growth_tick(start_time)
+            current_weather = GrowthService.get_current_weather()
+            if not current_weather:
+                return {"status": "success", "plants_updated": 0, "shards": 0}
+            shard_ranges = GrowthService.get_shard_ranges(shards)
+            chord(
+                [
+                    process_garden_shard.s(tick, current_weather.id, lower, upper)
+                    for lower, upper in shard_ranges
+                ]
+            )(aggregate_garden_shards.s(start_time.isoformat()))
+            return {
+                "status": "dispatched",
+                "tick": tick,
+                "shards": len(shard_ranges),
+            }
+        cycle_stats = GrowthService.process_growth_cycle()
         end_time = timezone.now()
         return {
             "status": "success",
-            "plants_updated": plants_updated,
+            "plants_updated": cycle_stats["plants_updated"],
+            "plants_caught_up": cycle_stats.get("plants_caught_up", 0),
+            "chunks": cycle_stats["chunks"],
+            "timings": cycle_stats["timings"],
             "duration": (end_time - start_time).total_seconds(),
         }
     except Exception as e:
         raise Exception(f"Failed to process garden updates: {str(e)}")
+
+
+@shared_task(bind=True, max_retries=5)
+def process_garden_shard(self, tick, weather_id, lower, upper):
+    """
+    Process growth updates for the gardens in one Garden.id range.
+    Safe to retry: plants already grown for this tick are skipped.
+    """
+    try:
+        start_time = timezone.now()
+        weather = WeatherState.objects.get(id=weather_id)
+        cycle_stats = GrowthService.process_growth_cycle(
+            tick=tick, weather=weather, garden_range=(lower, upper)
+        )
+        end_time = timezone.now()
+        return {
+            "plants_updated": cycle_stats["plants_updated"],
+            "plants_caught_up": cycle_stats.get("plants_caught_up", 0),
+            "chunks": cycle_stats["chunks"],
+            "timings": cycle_stats["timings"],
+            "duration": (end_time - start_time).total_seconds(),
+        }
+    except Exception as e:
+        raise self.retry(
+            exc=Exception(f"Failed to process garden shard: {str(e)}"),
+            countdown=2**self.request.retries,
+        )
+
+
+@shared_task
+def aggregate_garden_shards(shard_results, start_time):
+    """Combines the results of every shard of one growth cycle."""
+    end_time = timezone.now()
+    timings = {"fetch": 0.0, "compute": 0.0, "write": 0.0}
+    for result in shard_results:
+        for phase, duration in result["timings"].items():
+            timings[phase] += duration
+    return {
+        "status": "success",
+        "shards": len(shard_results),
+        "plants_updated": sum(result["plants_updated"] for result in shard_results),
+        "plants_caught_up": sum(
+            result["plants_caught_up"] for result in shard_results
+        ),
+        "chunks": sum(result["chunks"] for result in shard_results),
+        "timings": timings,
+        "slowest_shard": max(
+            (result["duration"] for result in shard_results), default=0.0
+        ),
+        "duration": (
+            end_time - timezone.datetime.fromisoformat(start_time)
+        ).total_seconds(),
+    }
+
+
+@shared_task(max_retries=5)
+def catch_up_garden_growth():
+    """Replays every growth tick missed while workers or beat were down."""
+    try:
+        start_time = timezone.now()
+        if settings.GARDEN["GROWTH_MODE"] == "lazy":
+            # Lazy gardens catch up when they are next read or touched
+            return {"status": "skipped", "mode": "lazy", "plants_updated": 0}
+        plants_updated = GrowthService.catch_up_growth()
+        end_time = timezone.now()
+        return {
+            "status": "success",
+            "plants_updated": plants_updated,
+            "duration": (end_time - start_time).total_seconds(),
+        }
+    except Exception as e:
+        raise Exception(f"Failed to catch up garden growth: {str(e)}")
+
+
+@shared_task(max_retries=5)
+def roll_garden_pests(seed=None):
+    """Rolls for pest infestations across all eligible gardens."""
+    try:
+        start_time = timezone.now()
+        if seed is None:
+            seed = settings.GARDEN["PEST_SEED"]
+        gardens_infested = GrowthService.roll_pests(seed)
+        end_time = timezone.now()
+        return {
+            "status": "success",
+            "gardens_infested": gardens_infested,
+            "duration": (end_time - start_time).total_seconds(),
+        }
+    except Exception as e:
+        raise Exception(f"Failed to roll garden pests: {str(e)}")
+
+
+@shared_task(max_retries=5)
+def prune_plant_tombstones():
+    """Deletes plant tombstones past their retention."""
+    try:
+        start_time = timezone.now()
+        tombstones_pruned = TombstoneService.prune(start_time)
+        end_time = timezone.now()
+        return {
+            "status": "success",
+            "tombstones_pruned": tombstones_pruned,
+            "duration": (end_time - start_time).total_seconds(),
+        }
+    except Exception as e:
+        raise Exception(f"Failed to prune plant tombstones: {str(e)}")
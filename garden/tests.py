@@ -1,3 +1,893 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from unittest import mock, skipUnless
+from base.renderers import ORJSONRenderer
+from base.utils import get_growth_tick
+from blockchain.models import WeatherState
+from blockchain.services import WeatherSnapshot
+from user.models import User
+from .events import GardenEventHub, GardenSubscription
+from .models import Garden, Plant, PlantType
+from .serializers import FastGardenSerializer, GardenSerializer
+from .services import (
+    GardenCache,
+    GardenEventTicket,
+    GrowthService,
+    PlantCatalog,
+    TombstoneService,
+)
+import asyncio
+import json
+import numpy as np
+import os
+import time
 
-# Create your tests here.
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+# (weather_type, temperature) pairs covering every weather branch
+WEATHER_CASES = [
+    ("sunny", 38.0),
+    ("sunny", 22.0),
+    ("cloudy", 18.0),
+    ("rainy", 15.0),
+    ("stormy", 12.0),
+]
+
+
+def make_weather(weather_type, temperature):
+    return WeatherState(
+        weather_type=weather_type,
+        temperature=temperature,
+        rainfall=0,
+        sunlight=0,
+        timestamp=timezone.now(),
+    )
+
+
+def create_plant_types(rng, count=4):
+    return [
+        PlantType.objects.create(
+            name=f"Type {index}",
+            growth_rate=float(rng.uniform(0.5, 2.0)),
+            max_health=100,
+            required_soil_quality=int(rng.integers(0, 101)),
+            description="",
+        )
+        for index in range(count)
+    ]
+
+
+def create_population(prefixes, plant_types, seed, gardens=12, plot_size=6):
+    """
+    Creates one identical, randomly seeded population of gardens and plants
+    per prefix. Garden and plant ids start with the prefix, so each copy can
+    be selected as a Garden.id range and plants can be paired across copies.
+    Progress values cluster around the stage thresholds, and damage, health
+    and soil quality reach both ends of their range.
+    """
+    rng = np.random.default_rng(seed)
+    stages = GrowthService.GROWTH_STAGES
+    progress_points = [0.0, 9.99, 10.0, 29.5, 59.9, 79.95, 80.0, 99.9, 100.0]
+    for garden_index in range(gardens):
+        pest_infestation = bool(rng.random() < 0.5)
+        garden_fields = {
+            "soil_quality": int(rng.choice([0, 100, rng.integers(0, 101)])),
+            "pest_infestation": pest_infestation,
+            "pest_type": "aphids" if pest_infestation else None,
+            "plot_size": plot_size,
+        }
+        plant_fields = [
+            {
+                "plant_type": plant_types[rng.integers(len(plant_types))],
+                "growth_stage": stages[rng.integers(len(stages) - 1)],
+                "health": int(rng.choice([1, 3, 100, rng.integers(0, 101)])),
+                "growth_progress": float(
+                    rng.choice(progress_points)
+                    if rng.random() < 0.5
+                    else rng.uniform(0, 100)
+                ),
+                "pest_damage": int(rng.choice([0, 95, 100, rng.integers(0, 101)])),
+                "slot_position": slot,
+            }
+            for slot in range(plot_size)
+        ]
+        for prefix in prefixes:
+            wallet = f"{prefix.encode().hex()}{garden_index:04x}".ljust(40, "0")
+            owner = User.objects.create_user(wallet_address=f"0x{wallet}")
+            garden = Garden.objects.create(
+                id=f"{prefix}-{garden_index:04d}", owner=owner, **garden_fields
+            )
+            Plant.objects.bulk_create(
+                Plant(id=f"{garden.id}-{slot}", garden=garden, **fields)
+                for slot, fields in enumerate(plant_fields)
+            )
+
+
+def random_growth_columns(rng, size):
+    """Kernel input columns drawn to hit every clamp and stage boundary"""
+    stages = GrowthService.GROWTH_STAGES
+    progress_points = np.array(
+        [0.0, 9.999999, 10.0, 10.000001, 29.99, 30.0, 60.0, 79.999, 80.0, 99.99, 100.0]
+    )
+    return {
+        "growth_rate": rng.uniform(0.1, 3.0, size),
+        "soil_quality": rng.integers(0, 101, size),
+        "health": np.where(
+            rng.random(size) < 0.2,
+            rng.choice([0, 1, 2, 100], size),
+            rng.integers(0, 101, size),
+        ),
+        # Damage above 90 hits the 0.1 pest reduction floor
+        "pest_damage": np.where(
+            rng.random(size) < 0.3,
+            rng.integers(88, 101, size),
+            rng.integers(0, 101, size),
+        ),
+        "pest_infestation": rng.random(size) < 0.5,
+        "stage": rng.integers(0, len(stages), size),
+        "required_soil_quality": rng.integers(0, 101, size),
+        "growth_progress": np.where(
+            rng.random(size) < 0.5,
+            rng.choice(progress_points, size),
+            rng.uniform(0, 100, size),
+        ),
+    }
+
+
+def get_plant_states(prefix):
+    """Plant states of one population copy, keyed by id without the prefix"""
+    return {
+        plant_id[len(prefix) :]: state
+        for plant_id, *state in Plant.objects.filter(
+            garden_id__startswith=f"{prefix}-"
+        ).values_list("id", "growth_progress", "health", "growth_stage")
+    }
+
+
+class GrowthKernelTestCase(SimpleTestCase):
+    def test_batch_matches_scalar_rules(self):
+        rng = np.random.default_rng(2024)
+        for weather_type, temperature in WEATHER_CASES:
+            weather = make_weather(weather_type, temperature)
+            columns = random_growth_columns(rng, 500)
+            growth_progress, health, stage = GrowthService.calculate_growth_batch(
+                columns, weather
+            )
+            for index in range(500):
+                plant = Plant(
+                    garden=Garden(
+                        soil_quality=int(columns["soil_quality"][index]),
+                        pest_infestation=bool(columns["pest_infestation"][index]),
+                    ),
+                    plant_type=PlantType(
+                        growth_rate=float(columns["growth_rate"][index]),
+                        required_soil_quality=int(
+                            columns["required_soil_quality"][index]
+                        ),
+                    ),
+                    growth_stage=GrowthService.GROWTH_STAGES[columns["stage"][index]],
+                    health=int(columns["health"][index]),
+                    growth_progress=float(columns["growth_progress"][index]),
+                    pest_damage=int(columns["pest_damage"][index]),
+                )
+                # The scalar growth cycle step, in its original order
+                growth = GrowthService.calculate_growth(plant, weather)
+                plant.growth_progress = min(100, plant.growth_progress + growth)
+                GrowthService.update_plant_health(plant, weather)
+                GrowthService.update_plant_stage(plant)
+                self.assertEqual(
+                    (
+                        float(growth_progress[index]),
+                        int(health[index]),
+                        GrowthService.GROWTH_STAGES[stage[index]],
+                    ),
+                    (plant.growth_progress, plant.health, plant.growth_stage),
+                    f"{weather_type} at {temperature}, plant {index}",
+                )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GrowthEngineTestCase(TestCase):
+    def setUp(self):
+        PlantCatalog._local = None
+        self.plant_types = create_plant_types(np.random.default_rng(7))
+
+    def test_unchanged_plants_keep_their_garden_version(self):
+        plant_type = PlantType.objects.create(
+            name="Moss",
+            growth_rate=1.0,
+            max_health=100,
+            required_soil_quality=0,
+            description="",
+        )
+        # Barren soil and mild weather: the plant neither grows nor wilts
+        garden = create_garden(1, plant_type, wallet_suffix=99, soil_quality=0)
+        weather = make_weather("cloudy", 18.0)
+        first_tick = get_growth_tick() + 1
+        for tick in range(first_tick, first_tick + 4):
+            stats = GrowthService.process_growth_cycle(
+                tick, weather, engine="python"
+            )
+            self.assertEqual(stats["plants_updated"], 0)
+            self.assertEqual(stats["plants_caught_up"], 0)
+        garden.refresh_from_db()
+        plant = garden.plants.get()
+        self.assertEqual(garden.version, 0)
+        self.assertEqual(plant.version, 0)
+        self.assertEqual(plant.growth_tick, first_tick + 3)
+
+    def test_chunked_cycle_matches_a_single_chunk(self):
+        tick = get_growth_tick() + 1
+        create_population(["k0a", "k0b"], self.plant_types, 21)
+        weather = make_weather("sunny", 22.0)
+        active = Plant.objects.active().filter(garden_id__startswith="k0a-").count()
+        with override_settings(GARDEN={**settings.GARDEN, "GROWTH_CHUNK_SIZE": 5}):
+            stats = GrowthService.process_growth_cycle(
+                tick, weather, ("k0a", "k0b"), engine="python"
+            )
+        self.assertEqual(stats["chunks"], -(-active // 5))
+        GrowthService.process_growth_cycle(
+            tick, weather, ("k0b", "k0c"), engine="python"
+        )
+        self.assertEqual(get_plant_states("k0a"), get_plant_states("k0b"))
+        # Keyset pagination reached every active plant
+        self.assertFalse(
+            Plant.objects.active().filter(growth_tick__lt=tick).exists()
+        )
+
+    def test_older_tick_never_overwrites_a_newer_one(self):
+        tick = get_growth_tick() + 1
+        create_population(["o0a"], self.plant_types, 22, gardens=3)
+        calculate_growth_batch = GrowthService.calculate_growth_batch
+
+        def overlapping_cycle(columns, weather):
+            # A newer cycle commits between this cycle's read and write
+            Plant.objects.update(growth_tick=tick + 1, growth_progress=42.0)
+            return calculate_growth_batch(columns, weather)
+
+        with mock.patch.object(
+            GrowthService, "calculate_growth_batch", side_effect=overlapping_cycle
+        ):
+            stats = GrowthService.process_growth_cycle(
+                tick, make_weather("sunny", 22.0), engine="python"
+            )
+        self.assertEqual(stats["plants_updated"], 0)
+        self.assertEqual(
+            set(Plant.objects.values_list("growth_tick", "growth_progress")),
+            {(tick + 1, 42.0)},
+        )
+
+    def test_materializing_without_change_skips_the_write(self):
+        garden = create_garden(2, self.plant_types[0], wallet_suffix=98)
+        tick = get_growth_tick() + 3
+        # No weather was recorded for the missed ticks, so nothing grows
+        self.assertEqual(GrowthService.materialize_gardens([garden.id], tick), 0)
+        garden.refresh_from_db()
+        self.assertEqual(garden.version, 0)
+        self.assertEqual(garden.growth_tick, tick)
+        self.assertEqual(
+            set(garden.plants.values_list("growth_tick", "version")), {(tick, 0)}
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "Requires PostgreSQL")
+    def test_sql_engine_matches_python_engine(self):
+        tick = get_growth_tick() + 1
+        for index, (weather_type, temperature) in enumerate(WEATHER_CASES):
+            python_prefix, sql_prefix = f"w{index}a", f"w{index}b"
+            create_population([python_prefix, sql_prefix], self.plant_types, index)
+            weather = make_weather(weather_type, temperature)
+            GrowthService.process_growth_cycle(
+                tick, weather, (python_prefix, sql_prefix), engine="python"
+            )
+            GrowthService.process_growth_cycle(
+                tick, weather, (sql_prefix, f"w{index}c"), engine="sql"
+            )
+            self.assertEqual(
+                get_plant_states(python_prefix),
+                get_plant_states(sql_prefix),
+                f"{weather_type} at {temperature}",
+            )
+
+    @skipUnless(connection.vendor == "postgresql", "Requires PostgreSQL")
+    def test_sql_engine_stays_in_range_and_retries_cleanly(self):
+        tick = get_growth_tick() + 1
+        create_population(["r0a", "r0b"], self.plant_types, 11)
+        outside = get_plant_states("r0b")
+        weather = make_weather("sunny", 38.0)
+        GrowthService.process_growth_cycle(tick, weather, ("r0a", "r0b"), engine="sql")
+        grown = get_plant_states("r0a")
+        versions = dict(Garden.objects.values_list("id", "version"))
+        self.assertEqual(get_plant_states("r0b"), outside)
+        # Every grown plant is stamped, changed or not
+        self.assertFalse(
+            Plant.objects.active()
+            .filter(garden_id__startswith="r0a-", growth_tick__lt=tick)
+            .exists()
+        )
+        # Changed plants carry their garden's new version
+        for garden_id, version in Plant.objects.filter(
+            garden_id__startswith="r0a-", growth_tick=tick
+        ).values_list("garden_id", "version"):
+            self.assertEqual(version, versions[garden_id])
+        # A retried tick finds nothing left to grow
+        stats = GrowthService.process_growth_cycle(
+            tick, weather, ("r0a", "r0b"), engine="sql"
+        )
+        self.assertEqual(stats["plants_updated"], 0)
+        self.assertEqual(get_plant_states("r0a"), grown)
+        self.assertEqual(dict(Garden.objects.values_list("id", "version")), versions)
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES, GARDEN={**settings.GARDEN, "GROWTH_MODE": "lazy"}
+)
+class LazyGrowthTestCase(TestCase):
+    def setUp(self):
+        PlantCatalog._local = None
+        plant_type = create_plant_types(np.random.default_rng(19), count=1)[0]
+        self.tick = get_growth_tick()
+        self.start = self.tick - 3
+        self.eager = create_garden(3, plant_type, wallet_suffix=1, id="e-0")
+        self.lazy = create_garden(3, plant_type, wallet_suffix=2, id="l-0")
+        Garden.objects.update(growth_tick=self.start)
+        Plant.objects.update(growth_tick=self.start)
+        # Recorded as the first missed tick began, so it covers all three
+        self.weather = WeatherState.objects.create(
+            weather_type="sunny", temperature=22.0, rainfall=0, sunlight=80
+        )
+        WeatherState.objects.update(
+            timestamp=datetime.fromtimestamp(
+                (self.start + 1) * settings.GARDEN["GROWTH_TICK_SECONDS"],
+                tz=dt_timezone.utc,
+            )
+        )
+        WeatherSnapshot._local = (1, self.weather)
+        WeatherSnapshot._checked_at = time.monotonic()
+        self.client = APIClient()
+        self.client.force_authenticate(self.lazy.owner)
+
+    def tearDown(self):
+        WeatherSnapshot._local = None
+
+    def get_states(self, garden):
+        return list(
+            garden.plants.order_by("slot_position").values_list(
+                "growth_progress", "health", "growth_stage", "growth_tick"
+            )
+        )
+
+    def test_read_applies_missed_ticks_once(self):
+        for tick in range(self.start + 1, self.tick + 1):
+            GrowthService.process_growth_cycle(
+                tick, self.weather, ("e", "f"), engine="python"
+            )
+        response = self.client.get("/api/v1/garden/")
+        self.assertEqual(response.status_code, 200)
+        self.lazy.refresh_from_db()
+        self.assertEqual(self.lazy.growth_tick, self.tick)
+        self.assertEqual(self.lazy.version, 1)
+        eager_states = self.get_states(self.eager)
+        self.assertTrue(all(state[0] > 0 for state in eager_states))
+        for lazy, eager in zip(self.get_states(self.lazy), eager_states):
+            self.assertAlmostEqual(lazy[0], eager[0])
+            self.assertEqual(lazy[1:], eager[1:])
+        # The garden is current now: a read is only the cached version lookup
+        with self.assertNumQueries(1):
+            cached = self.client.get("/api/v1/garden/")
+        self.assertEqual(cached.content, response.content)
+        self.lazy.refresh_from_db()
+        self.assertEqual(self.lazy.version, 1)
+
+    def test_read_without_missed_ticks_writes_nothing(self):
+        Garden.objects.update(growth_tick=self.tick)
+        Plant.objects.update(growth_tick=self.tick)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/v1/garden/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(
+            any(
+                query["sql"].startswith("UPDATE")
+                for query in queries.captured_queries
+            )
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PlantCatalogTestCase(TestCase):
+    def setUp(self):
+        PlantCatalog._local = None
+
+    def test_refresh_reloads_unchanged_version(self):
+        PlantCatalog.get()
+        # Created without invalidating, so the shared version stays put
+        plant_type = create_plant_types(np.random.default_rng(1), count=1)[0]
+        self.assertNotIn(plant_type.id, PlantCatalog.get().records)
+        self.assertIn(plant_type.id, PlantCatalog.get(refresh=True).records)
+
+    def test_unknown_plant_type_is_reported(self):
+        row = ("plant", "seed", 100, 0.0, 0, 100, False, "missing")
+        with self.assertRaisesMessage(Exception, "Unknown plant type: missing"):
+            GrowthService._build_growth_columns([row])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GardenEventTicketTestCase(TestCase):
+    def test_ticket_is_single_use(self):
+        user = User.objects.create_user(wallet_address=f"0x{'ab' * 20}")
+        ticket = GardenEventTicket.issue(user)
+        self.assertEqual(GardenEventTicket.redeem(ticket), user.id)
+        self.assertIsNone(GardenEventTicket.redeem(ticket))
+
+    def test_unknown_ticket_is_refused(self):
+        self.assertIsNone(GardenEventTicket.redeem("not-a-ticket"))
+
+
+def create_garden(plants, plant_type, wallet_suffix=0, **fields):
+    """Creates a garden with the given number of plants of one type"""
+    owner = User.objects.create_user(wallet_address=f"0x{wallet_suffix:040x}")
+    garden = Garden.objects.create(owner=owner, plot_size=max(plants, 1), **fields)
+    Plant.objects.bulk_create(
+        Plant(garden=garden, plant_type=plant_type, slot_position=slot)
+        for slot in range(plants)
+    )
+    return garden
+
+
+class ORJSONRendererTestCase(TestCase):
+    def test_output_matches_json_renderer(self):
+        payloads = [
+            {"status": "success", "data": {"count": 3, "ok": True, "none": None}},
+            {"small": 1e-05, "tiny": 2.5e-300, "large": 1e22, "plain": 0.1},
+            {"text": "line\u2028separator\u2029paragraph", "unicode": "caf\u00e9"},
+            {"created": datetime(2024, 5, 1, 12, 30, tzinfo=dt_timezone.utc)},
+            [{"nested": [1, 2.0, -0.5, None]}],
+        ]
+        for payload in payloads:
+            self.assertEqual(
+                ORJSONRenderer().render(payload), JSONRenderer().render(payload)
+            )
+
+    def test_non_finite_floats_are_refused(self):
+        for value in [float("nan"), float("inf"), float("-inf")]:
+            payload = {"plants": [{"growth_progress": value}], "pest_type": None}
+            with self.assertRaises(ValueError):
+                JSONRenderer().render(payload)
+            with self.assertRaises(ValueError):
+                ORJSONRenderer().render(payload)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FastGardenSerializerTestCase(TestCase):
+    def setUp(self):
+        PlantCatalog._local = None
+        self.plant_type = PlantType.objects.create(
+            name="Fern",
+            growth_rate=2.5e-7,
+            max_health=100,
+            required_soil_quality=40,
+            description="Shade\u2028loving",
+        )
+
+    def assert_same_output(self, garden):
+        expected = GardenSerializer(garden).data
+        fast = FastGardenSerializer.serialize(garden.id)
+        self.assertEqual(fast, expected)
+        self.assertEqual(
+            ORJSONRenderer().render(fast), JSONRenderer().render(expected)
+        )
+
+    def test_matches_garden_serializer(self):
+        garden = create_garden(3, self.plant_type, last_activity=None)
+        Plant.objects.filter(garden=garden, slot_position=0).update(
+            growth_progress=1e-05, growth_multiplier=1e20
+        )
+        Plant.objects.filter(garden=garden, slot_position=1).update(
+            growth_progress=99.99999, growth_stage="flowering"
+        )
+        self.assert_same_output(garden)
+
+    def test_matches_garden_serializer_with_pests(self):
+        garden = create_garden(
+            2,
+            self.plant_type,
+            pest_infestation=True,
+            pest_type="aphids",
+            pest_severity=45,
+            last_activity=timezone.now(),
+        )
+        self.assert_same_output(garden)
+
+    def test_matches_garden_serializer_without_plants(self):
+        self.assert_same_output(create_garden(0, self.plant_type))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GardenReadQueryTestCase(TestCase):
+    """
+    With the plant catalog loaded, a cold garden read costs the version
+    lookup plus one garden and one plant query whatever the plant count,
+    and a cached read only the version lookup.
+    """
+
+    def setUp(self):
+        PlantCatalog._local = None
+        self.plant_type = create_plant_types(np.random.default_rng(5), count=1)[0]
+        PlantCatalog.get()
+        weather = WeatherState.objects.create(
+            weather_type="sunny", temperature=21.0, rainfall=0, sunlight=80
+        )
+        WeatherSnapshot._local = (1, weather)
+        WeatherSnapshot._checked_at = time.monotonic()
+        self.client = APIClient()
+
+    def tearDown(self):
+        WeatherSnapshot._local = None
+
+    def assert_read_queries(self, url, plants):
+        garden = create_garden(plants, self.plant_type, wallet_suffix=plants)
+        self.client.force_authenticate(garden.owner)
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).content, response.content)
+
+    def test_garden_view_queries(self):
+        for plants in [1, 16]:
+            self.assert_read_queries("/api/v1/garden/", plants)
+
+    def test_garden_status_view_queries(self):
+        for plants in [1, 16]:
+            self.assert_read_queries("/api/v1/garden/status/", plants)
+
+
+class DroppingPubSub:
+    """Pub/sub stand-in that loses its connection after its messages"""
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def subscribe(self, channel):
+        pass
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+        raise RedisConnectionError("Connection closed by server.")
+
+    async def aclose(self):
+        pass
+
+
+class GardenEventHubTestCase(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(GardenEventHub.subscriptions.clear)
+
+    async def test_listener_resubscribes_and_resyncs_streams(self):
+        message = {"type": "message", "data": json.dumps({"gardens": [1]})}
+        connections = [DroppingPubSub([message]), DroppingPubSub([])]
+        client = mock.Mock(aclose=mock.AsyncMock())
+        client.pubsub.side_effect = connections
+        subscription = GardenSubscription(2)
+        GardenEventHub.subscriptions[2].add(subscription)
+        with mock.patch(
+            "garden.events.aioredis.from_url", return_value=client
+        ), mock.patch("garden.events.asyncio.sleep") as sleep, self.settings(
+            GARDEN_EVENTS={
+                **settings.GARDEN_EVENTS,
+                "RECONNECT_SECONDS": 1,
+                "MAX_RECONNECT_SECONDS": 30,
+            }
+        ):
+            # The third connection attempt ends the test
+            sleep.side_effect = [None, asyncio.CancelledError()]
+            with self.assertRaises(asyncio.CancelledError):
+                await GardenEventHub._listen()
+        # Garden 1's change did not concern garden 2's stream
+        self.assertEqual(subscription.pending, {"garden", "weather"})
+        # The backoff resets once a resubscription succeeds
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [1, 1])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PlantManagementViewTestCase(TestCase):
+    def setUp(self):
+        PlantCatalog._local = None
+        self.plant_type = create_plant_types(np.random.default_rng(11), count=1)[0]
+        self.garden = create_garden(0, self.plant_type)
+        self.client = APIClient()
+        self.client.force_authenticate(self.garden.owner)
+
+    def test_unknown_plant_type_is_a_bad_request(self):
+        response = self.client.post(
+            "/api/v1/garden/plants/",
+            {"plant_type_id": "missing", "slot_position": 0},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["error"], {"plant_type_id": ["Invalid plant type."]}
+        )
+        self.assertFalse(self.garden.plants.exists())
+
+    def test_known_plant_type_is_planted(self):
+        response = self.client.post(
+            "/api/v1/garden/plants/",
+            {"plant_type_id": self.plant_type.id, "slot_position": 0},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.garden.plants.get().plant_type_id, self.plant_type.id)
+
+
+class PestRollTestCase(TestCase):
+    def setUp(self):
+        PlantCatalog._local = None
+        plant_type = create_plant_types(np.random.default_rng(13), count=1)[0]
+        self.gardens = [
+            create_garden(2, plant_type, wallet_suffix=index + 1)
+            for index in range(200)
+        ]
+        self.now = timezone.now()
+
+    def roll(self, now):
+        with mock.patch("garden.services.GardenCache.publish"):
+            infested = GrowthService.roll_pests(seed=3, now=now)
+        gardens = Garden.objects.filter(pest_infestation=True)
+        return infested, dict(gardens.values_list("id", "pest_severity"))
+
+    def test_rolls_apply_in_two_updates(self):
+        with CaptureQueriesContext(connection) as queries:
+            infested, severities = self.roll(self.now)
+        self.assertGreater(infested, 0)
+        self.assertEqual(len(severities), infested)
+        updates = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(len(updates), 2)
+        for plant in Plant.objects.filter(garden_id__in=severities):
+            garden = Garden.objects.get(id=plant.garden_id)
+            self.assertEqual(plant.pest_damage, severities[garden.id])
+            self.assertEqual(plant.version, garden.version)
+            self.assertEqual(garden.version, 1)
+
+    def test_seeded_rolls_differ_between_ticks(self):
+        first = self.roll(self.now)
+        Garden.objects.update(pest_infestation=False, pest_type=None)
+        self.assertEqual(self.roll(self.now), first)
+        Garden.objects.update(pest_infestation=False, pest_type=None)
+        later = self.now + timedelta(seconds=GrowthService.PEST_ROLL_SECONDS)
+        self.assertNotEqual(self.roll(later), first)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GardenChangesViewTestCase(TestCase):
+    def setUp(self):
+        PlantCatalog._local = None
+        plant_type = create_plant_types(np.random.default_rng(17), count=1)[0]
+        self.garden = create_garden(3, plant_type)
+        self.plants = list(self.garden.plants.order_by("slot_position"))
+        self.client = APIClient()
+        self.client.force_authenticate(self.garden.owner)
+        # Version 1 changes the first plant, version 2 removes the second
+        GardenCache.bump([self.garden.id], Plant.objects.filter(id=self.plants[0].id))
+        response = self.client.delete(f"/api/v1/garden/plants/{self.plants[1].id}/")
+        self.assertEqual(response.status_code, 204)
+
+    def get_changes(self, since=None):
+        params = {} if since is None else {"since": since}
+        response = self.client.get("/api/v1/garden/changes/", params)
+        self.assertEqual(response.status_code, 200)
+        changes = response.json()["data"]
+        self.assertEqual(changes["version"], 2)
+        return changes
+
+    def plant_ids(self, changes):
+        return sorted(plant["id"] for plant in changes["plants"])
+
+    def test_changes_since_a_version(self):
+        changes = self.get_changes(since=0)
+        self.assertFalse(changes["full"])
+        self.assertEqual(self.plant_ids(changes), [self.plants[0].id])
+        self.assertEqual(changes["removed"], [self.plants[1].id])
+        changes = self.get_changes(since=1)
+        self.assertEqual(changes["plants"], [])
+        self.assertEqual(changes["removed"], [self.plants[1].id])
+        self.assertEqual(changes["garden"]["version"], 2)
+
+    def test_current_version_has_no_changes(self):
+        changes = self.get_changes(since=2)
+        self.assertFalse(changes["full"])
+        self.assertIsNone(changes["garden"])
+        self.assertEqual(changes["plants"], [])
+        self.assertEqual(changes["removed"], [])
+
+    def test_missing_or_future_since_returns_everything(self):
+        for since in [None, "latest", 5]:
+            changes = self.get_changes(since=since)
+            self.assertTrue(changes["full"])
+            self.assertEqual(
+                self.plant_ids(changes),
+                sorted([self.plants[0].id, self.plants[2].id]),
+            )
+            self.assertEqual(changes["removed"], [])
+
+    def test_since_before_pruned_tombstones_returns_everything(self):
+        later = timezone.now() + timedelta(
+            days=settings.GARDEN["TOMBSTONE_RETENTION_DAYS"] + 1
+        )
+        self.assertEqual(TombstoneService.prune(later), 1)
+        self.garden.refresh_from_db()
+        self.assertEqual(self.garden.tombstone_floor, 2)
+        changes = self.get_changes(since=1)
+        self.assertTrue(changes["full"])
+        self.assertEqual(len(changes["plants"]), 2)
+        self.assertEqual(changes["removed"], [])
+        # Clients at or past the floor still get deltas
+        self.assertFalse(self.get_changes(since=2)["full"])
+
+
+class GardenActivityTestCase(TestCase):
+    def setUp(self):
+        PlantCatalog._local = None
+        self.plant_type = create_plant_types(np.random.default_rng(9), count=1)[0]
+
+    def test_activities_bump_the_version_in_two_updates(self):
+        garden = create_garden(
+            3,
+            self.plant_type,
+            pest_infestation=True,
+            pest_type="aphids",
+            pest_severity=50,
+        )
+        garden.plants.update(pest_damage=50)
+        with CaptureQueriesContext(connection) as queries, mock.patch(
+            "garden.services.GardenCache.publish"
+        ) as publish, self.captureOnCommitCallbacks(execute=True):
+            applied = GrowthService.process_user_activities(
+                garden, ["transfer", "transfer", "swap"]
+            )
+        self.assertEqual(applied, 2)
+        # One garden and one plant UPDATE, which carry the version bump
+        updates = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(len(updates), 2)
+        publish.assert_called_once_with({"gardens": [garden.id]})
+        garden.refresh_from_db()
+        self.assertEqual(garden.version, 1)
+        self.assertEqual(garden.total_onchain_actions, 2)
+        self.assertFalse(garden.pest_infestation)
+        for plant in garden.plants.all():
+            self.assertEqual(plant.version, 1)
+            self.assertEqual(plant.pest_damage, 0)
+            self.assertAlmostEqual(plant.growth_multiplier, 1.4)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class VersionedResponseTestCase(TestCase):
+    def setUp(self):
+        PlantCatalog._local = None
+        plant_type = create_plant_types(np.random.default_rng(23), count=1)[0]
+        self.garden = create_garden(2, plant_type)
+        self.client = APIClient()
+        self.client.force_authenticate(self.garden.owner)
+
+    def get_garden(self, etag=None):
+        headers = {} if etag is None else {"HTTP_IF_NONE_MATCH": etag}
+        return self.client.get("/api/v1/garden/", **headers)
+
+    def test_held_version_is_not_modified(self):
+        response = self.get_garden()
+        self.assertEqual(response.status_code, 200)
+        etag = f'"garden-{self.garden.id}-0"'
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        for if_none_match in [etag, f'W/"other", {etag}']:
+            with self.assertNumQueries(1):
+                response = self.get_garden(if_none_match)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b"")
+            self.assertEqual(response["ETag"], etag)
+
+    def test_new_version_gets_a_new_etag_and_cache_key(self):
+        first = self.get_garden()
+        old_key = GardenCache.get_key("garden", self.garden.id, 0)
+        self.assertEqual(GardenCache.get_response(old_key), first.content)
+        Garden.objects.filter(id=self.garden.id).update(soil_quality=55)
+        GardenCache.bump([self.garden.id])
+        response = self.get_garden(first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], f'"garden-{self.garden.id}-1"')
+        self.assertEqual(response.json()["data"]["soil_quality"], 55)
+        new_key = GardenCache.get_key("garden", self.garden.id, 1)
+        self.assertNotEqual(new_key, old_key)
+        self.assertEqual(GardenCache.get_response(new_key), response.content)
+        # The old version's entry is left to expire, never rewritten
+        self.assertEqual(GardenCache.get_response(old_key), first.content)
+
+
+@skipUnless(os.getenv("RUN_BENCHMARKS"), "Set RUN_BENCHMARKS to run benchmarks")
+@override_settings(CACHES=LOCMEM_CACHES)
+class GardenRenderBenchmark(TestCase):
+    ROUNDS = 20
+
+    def setUp(self):
+        PlantCatalog._local = None
+        self.plant_type = create_plant_types(np.random.default_rng(3), count=1)[0]
+
+    def measure(self, render):
+        start = time.perf_counter()
+        for _ in range(self.ROUNDS):
+            render()
+        return (time.perf_counter() - start) / self.ROUNDS * 1000
+
+    def test_render_garden(self):
+        for index, plants in enumerate([4, 64, 1024]):
+            garden = create_garden(plants, self.plant_type, wallet_suffix=index)
+            PlantCatalog.get()
+            drf_ms = self.measure(
+                lambda: JSONRenderer().render(
+                    GardenSerializer(Garden.objects.get(id=garden.id)).data
+                )
+            )
+            fast_ms = self.measure(
+                lambda: ORJSONRenderer().render(
+                    FastGardenSerializer.serialize(garden.id)
+                )
+            )
+            print(
+                f"{plants} plants: GardenSerializer + JSONRenderer {drf_ms:.2f} ms, "
+                f"FastGardenSerializer + ORJSONRenderer {fast_ms:.2f} ms"
+            )
+
+
+@skipUnless(os.getenv("RUN_BENCHMARKS"), "Set RUN_BENCHMARKS to run benchmarks")
+@override_settings(CACHES=LOCMEM_CACHES)
+class GrowthCycleBenchmark(TestCase):
+    GARDENS = 40
+    PLOT_SIZE = 50
+
+    def setUp(self):
+        PlantCatalog._local = None
+        self.plant_types = create_plant_types(np.random.default_rng(9))
+
+    def test_cycle_cost_by_harvested_fraction(self):
+        tick = get_growth_tick() + 1
+        weather = make_weather("sunny", 22.0)
+        plants = self.GARDENS * self.PLOT_SIZE
+        for index, fraction in enumerate([0.0, 0.5, 0.9, 0.99]):
+            prefix = f"h{index}"
+            create_population(
+                [prefix], self.plant_types, index, self.GARDENS, self.PLOT_SIZE
+            )
+            population = Plant.objects.filter(garden_id__startswith=f"{prefix}-")
+            harvested = list(
+                population.order_by("id").values_list("id", flat=True)[
+                    : int(plants * fraction)
+                ]
+            )
+            population.filter(id__in=harvested).update(growth_stage="harvest")
+            start = time.perf_counter()
+            stats = GrowthService.process_growth_cycle(
+                tick, weather, (prefix, f"h{index + 1}"), engine="python"
+            )
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(
+                f"{fraction:.0%} of {plants} plants harvested: {elapsed_ms:.1f} ms, "
+                f"{stats['chunks']} chunks, {stats['plants_updated']} plants updated"
+            )
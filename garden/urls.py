@@ -1,5 +1,13 @@
 from django.urls import path
-from .views import GardenView, GardenStatusView, PlantTypeView, PlantManagementView
+from .views import (
+    GardenView,
+    GardenStatusView,
+    GardenChangesView,
+    GardenEventTicketView,
+    PlantTypeView,
+    PlantManagementView,
+)
+from .events import garden_events
 
 
 app_name = "gerden"
@@ -8,6 +16,12 @@ urlpatterns = [
     # Garden management
     path("", GardenView.as_view(), name="garden-detail"),
     path("status/", GardenStatusView.as_view(), name="system-status"),
+    path("changes/", GardenChangesView.as_view(), name="garden-changes"),
+    # Pushed garden and weather updates (server-sent events)
+    path("events/", garden_events, name="garden-events"),
+    path(
+        "events/ticket/", GardenEventTicketView.as_view(), name="garden-event-ticket"
+    ),
     # Plant types
     path("plant-types/", PlantTypeView.as_view(), name="plant-types"),
     # Plant management
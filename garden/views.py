@@ -1,11 +1,52 @@
+from django.conf import settings
+from django.db.transaction import atomic
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Garden, PlantType, Plant
-from .serializers import GardenSerializer, PlantTypeSerializer, PlantSerializer
+from rest_framework.exceptions import ValidationError
+from base.renderers import ORJSONRenderer
+from .models import Garden, PlantType, Plant, PlantTombstone
+from .serializers import (
+    FastGardenSerializer,
+    PlantSerializer,
+    GardenChangeSerializer,
+    PlantChangeSerializer,
+)
+from .services import GardenCache, GardenEventTicket, PlantCatalog
 from rest_framework.throttling import UserRateThrottle
 
 
+def versioned_response(request, etag, get_content):
+    """
+    Answers 304 when the client already holds this version, otherwise
+    serves the rendered JSON get_content returns for it.
+    """
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(get_content(), content_type="application/json")
+    response["ETag"] = etag
+    # Clients must revalidate, which costs a single version lookup
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def render_cached(cache_key, build_payload):
+    """Returns the rendered JSON cached under a key, rendering it on a miss"""
+    content = GardenCache.get_response(cache_key)
+    if content is None:
+        content = ORJSONRenderer().render(build_payload())
+        GardenCache.set_response(cache_key, content)
+    return content
+
+
+def build_garden_payload(garden_id):
+    """GardenView's response body for a garden"""
+    return {"success": True, "data": FastGardenSerializer.serialize(garden_id)}
+
+
 class GardenView(APIView):
     """Get or create a user's garden"""
 
@@ -13,10 +54,19 @@ class GardenView(APIView):
 
     def get(self, request):
         try:
-            garden, created = Garden.objects.get_or_create(owner=request.user)
-            response_data = GardenSerializer(garden).data
-            return Response(
-                {"success": True, "data": response_data}, status=status.HTTP_200_OK
+            # Pending lazy growth is materialized before the version is read
+            state = GardenCache.get_current_version(owner=request.user)
+            if state is None:
+                garden = Garden.objects.create(owner=request.user)
+                state = (garden.id, garden.version)
+            garden_id, version = state
+            return versioned_response(
+                request,
+                f'"garden-{garden_id}-{version}"',
+                lambda: render_cached(
+                    GardenCache.get_key("garden", garden_id, version),
+                    lambda: build_garden_payload(garden_id),
+                ),
             )
         except Exception as e:
             return Response(
@@ -32,24 +82,39 @@ class GardenStatusView(APIView):
 
     def get(self, request):
         """Get current garden status"""
-        from blockchain.models import WeatherState
+        from blockchain.services import WeatherSnapshot
         from blockchain.serializers import WeatherStateSerializer
 
         try:
-            garden = request.user.garden
-            current_weather = WeatherState.objects.last()
-            garden_data = GardenSerializer(garden).data
-            weather_data = (
-                WeatherStateSerializer(current_weather).data
-                if current_weather
-                else None
-            )
-            return Response(
-                {
+            state = GardenCache.get_current_version(owner=request.user)
+            if state is None:
+                raise Garden.DoesNotExist("User has no garden.")
+            garden_id, version = state
+            weather_version = WeatherSnapshot.get_version()
+
+            def build_payload():
+                current_weather = WeatherSnapshot.get()
+                garden_data = FastGardenSerializer.serialize(garden_id)
+                weather_data = (
+                    WeatherStateSerializer(current_weather).data
+                    if current_weather
+                    else None
+                )
+                return {
                     "status": "success",
                     "data": {"garden_data": garden_data, "weather_data": weather_data},
-                },
-                status=status.HTTP_200_OK,
+                }
+
+            # Status responses also change whenever the weather does
+            return versioned_response(
+                request,
+                f'"garden-status-{garden_id}-{version}-{weather_version}"',
+                lambda: render_cached(
+                    GardenCache.get_key(
+                        f"status:{weather_version}", garden_id, version
+                    ),
+                    build_payload,
+                ),
             )
         except Exception as e:
             return Response(
@@ -61,21 +126,108 @@ class GardenStatusView(APIView):
             )
 
 
-class PlantTypeView(APIView):
+class GardenChangesView(APIView):
+    """Plants and garden fields changed since a version the client has seen"""
+
     throttle_classes = [UserRateThrottle]
 
     def get(self, request):
-        """Get available plant types"""
+        """
+        Returns everything newer than the since query parameter, with the
+        ids of removed plants. Without a usable since, or with one older
+        than the garden's pruned tombstones, the whole garden is returned
+        and full is true.
+        """
+        try:
+            state = GardenCache.get_current_version(owner=request.user)
+            if state is None:
+                raise Garden.DoesNotExist("User has no garden.")
+            garden_id, version = state
+            try:
+                since = int(request.query_params.get("since", ""))
+            except ValueError:
+                since = None
+            full = since is None or since > version
+            if full:
+                since = -1
+            changes = {
+                "version": version,
+                "full": full,
+                "garden": None,
+                "plants": [],
+                "removed": [],
+            }
+            if since < version:
+                garden = Garden.objects.get(id=garden_id)
+                if since < garden.tombstone_floor:
+                    # Removals after since may have been pruned
+                    full = changes["full"] = True
+                    since = -1
+                changes["garden"] = GardenChangeSerializer(garden).data
+                changes["plants"] = PlantChangeSerializer(
+                    Plant.objects.filter(garden_id=garden_id, version__gt=since),
+                    many=True,
+                ).data
+                if not full:
+                    changes["removed"] = list(
+                        PlantTombstone.objects.filter(
+                            garden_id=garden_id, version__gt=since
+                        ).values_list("plant_id", flat=True)
+                    )
+            return Response(
+                {"status": "success", "data": changes}, status=status.HTTP_200_OK
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "status": "error",
+                    "error": f"Garden changes retrieval failed: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class GardenEventTicketView(APIView):
+    throttle_classes = [UserRateThrottle]
+
+    def post(self, request):
+        """Issue a single-use ticket for opening the garden event stream"""
+        if not settings.GARDEN_EVENTS["ENABLED"]:
+            return Response(
+                {"status": "error", "error": "Garden events are disabled."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
         try:
-            plant_types = PlantType.objects.all()
-            plant_types_data = PlantTypeSerializer(plant_types, many=True).data
+            ticket = GardenEventTicket.issue(request.user)
             return Response(
                 {
                     "status": "success",
-                    "data": {"plant_types_data": plant_types_data},
+                    "data": {
+                        "ticket": ticket,
+                        "expires_in": settings.GARDEN_EVENTS["TICKET_TTL"],
+                    },
                 },
-                status=status.HTTP_200_OK,
+                status=status.HTTP_201_CREATED,
             )
+        except Exception as e:
+            return Response(
+                {
+                    "status": "error",
+                    "error": f"Garden event ticket creation failed: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class PlantTypeView(APIView):
+    throttle_classes = [UserRateThrottle]
+
+    def get(self, request):
+        """Get available plant types"""
+        try:
+            # Served from the precompiled in-memory catalog
+            catalog = PlantCatalog.get()
+            return versioned_response(request, catalog.etag, lambda: catalog.content)
         except Exception as e:
             return Response(
                 {
@@ -105,15 +257,23 @@ class PlantManagementView(APIView):
                     )
                 plant = serializer.save(
                     garden=garden,
-                    plant_type=PlantType.objects.filter(
-                        id=serializer.validated_data["plant_type_id"]
-                    ).first(),
+                    plant_type=PlantType(
+                        **PlantCatalog.get_record(
+                            serializer.validated_data["plant_type_id"]
+                        )._asdict()
+                    ),
                 )
+                GardenCache.bump([garden.id], Plant.objects.filter(id=plant.id))
                 response_data = PlantSerializer(plant).data
                 return Response(
                     {"status": "success", "data": {"plant_data": response_data}},
                     status=status.HTTP_201_CREATED,
                 )
+        except ValidationError as e:
+            return Response(
+                {"status": "error", "error": e.detail},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
             return Response(
                 {
@@ -128,7 +288,17 @@ class PlantManagementView(APIView):
         try:
             garden = Garden.objects.filter(owner=request.user).first()
             plant = Plant.objects.filter(id=plant_id, garden=garden).first()
-            plant.delete()
+            with atomic():
+                plant.delete()
+                GardenCache.bump([garden.id])
+                # Delta readers learn about the removal from its tombstone
+                PlantTombstone.objects.create(
+                    garden=garden,
+                    plant_id=plant_id,
+                    version=Garden.objects.values_list("version", flat=True).get(
+                        id=garden.id
+                    ),
+                )
             return Response(status=status.HTTP_204_NO_CONTENT)
         except Exception as e:
             return Response(
@@ -2,15 +2,111 @@ from django.contrib.auth import get_user_model
 from .models import UserAuthentication
 from django.utils import timezone
 from rest_framework.exceptions import AuthenticationFailed
-from eth_account.messages import encode_defunct
 from web3 import Web3
 from django.conf import settings
-from django.db.transaction import atomic
+from django.core.cache import cache
+from django.db.transaction import atomic, on_commit
 from base.utils import generate_hex_token
+from .verification import SignatureVerifier, VerificationOverloaded
+from collections import OrderedDict
+import hashlib
+import threading
+import time
 
 
 User = get_user_model()
 
+
+class TokenCache:
+    """
+    Validated auth tokens, cached in a small per-process LRU and in shared
+    Redis entries keyed by a SHA-256 of the token. Entries never outlive
+    the token's expiry. Redis is authoritative: a process only trusts its
+    own copy for AUTH_TOKEN_CACHE_LOCAL_TTL seconds, so an evicted token
+    stops working everywhere within that window.
+    Only the user's authentication fields are cached, never a pickled
+    model instance; each hit builds a fresh User whose other fields load
+    from the database on first access.
+    """
+
+    KEY_PREFIX = "auth:token:"
+    USER_FIELDS = (
+        "id",
+        "wallet_address",
+        "email",
+        "is_active",
+        "is_staff",
+        "is_superuser",
+    )
+    _local = OrderedDict()  # key -> (user field values, valid_until)
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_key(cls, auth_token):
+        """Cache key for a token; the raw token is never stored"""
+        return cls.KEY_PREFIX + hashlib.sha256(auth_token.encode()).hexdigest()
+
+    @classmethod
+    def _build_user(cls, values):
+        """
+        A User loaded with only the cached fields. Requests get their own
+        instances, so relations cached on one request's user (e.g.
+        user.garden) never leak into the next.
+        """
+        return User.from_db("default", cls.USER_FIELDS, values)
+
+    @classmethod
+    def _store_local(cls, key, values, expiry):
+        """Keeps a short-lived local copy, dropping the least recently used"""
+        valid_until = min(
+            time.time() + settings.AUTH_TOKEN_CACHE_LOCAL_TTL, expiry.timestamp()
+        )
+        with cls._lock:
+            cls._local[key] = (values, valid_until)
+            cls._local.move_to_end(key)
+            while len(cls._local) > settings.AUTH_TOKEN_CACHE_LOCAL_SIZE:
+                cls._local.popitem(last=False)
+
+    @classmethod
+    def get(cls, auth_token):
+        """Returns the cached user for a token, or None on a miss"""
+        key = cls._get_key(auth_token)
+        with cls._lock:
+            entry = cls._local.get(key)
+            if entry is not None:
+                if entry[1] > time.time():
+                    cls._local.move_to_end(key)
+                    return cls._build_user(entry[0])
+                del cls._local[key]
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        values, expiry = entry
+        if expiry <= timezone.now():
+            return None
+        cls._store_local(key, values, expiry)
+        return cls._build_user(values)
+
+    @classmethod
+    def set(cls, auth_token, user, expiry):
+        """Caches a validated token until it expires"""
+        timeout = (expiry - timezone.now()).total_seconds()
+        if timeout <= 0:
+            return
+        key = cls._get_key(auth_token)
+        values = tuple(getattr(user, name) for name in cls.USER_FIELDS)
+        cache.set(key, (values, expiry), timeout)
+        cls._store_local(key, values, expiry)
+
+    @classmethod
+    def evict(cls, auth_token):
+        """Drops a token from Redis and this process"""
+        key = cls._get_key(auth_token)
+        cache.delete(key)
+        with cls._lock:
+            cls._local.pop(key, None)
+
+
 class WalletAuthenticationBackend:
     def authenticate(self, request, wallet_address=None, signature=None):
         """
@@ -23,15 +119,10 @@ class WalletAuthenticationBackend:
             if not Web3.is_address(wallet_address):
                 raise AuthenticationFailed("Invalid Ethereum address.")
             wallet_address = wallet_address.lower()
-            # Generate a hash of a message equivalent to that which was signed
+            # Recover address from a message equivalent to that which was signed
             message = f"Sign in to Chain Gardens with wallet: {wallet_address}"
-            message_hash = encode_defunct(text=message)
-            # Recover address from signature
-            w3 = Web3()
-            recovered_address = w3.eth.account.recover_message(
-                message_hash, signature=signature
-            )
-            if recovered_address.lower() != wallet_address:
+            recovered_address = SignatureVerifier.recover(message, signature)
+            if recovered_address != wallet_address:
                 raise AuthenticationFailed("Invalid signature.")
             with atomic():
                 # Retrieve existing or create new user object
@@ -40,6 +131,9 @@ class WalletAuthenticationBackend:
                 user.save()
                 # Invalidate any existing sessions for security
                 if hasattr(user, "auth_session"):
+                    # The replaced token stops validating once this commits
+                    old_token = user.auth_session.auth_token
+                    on_commit(lambda: TokenCache.evict(old_token))
                     user.auth_session.auth_token = generate_hex_token()
                     user.auth_session.expiry = timezone.now() + timezone.timedelta(seconds=settings.AUTH_TOKEN_EXPIRY)
                     user.auth_session.save()
@@ -51,6 +145,8 @@ class WalletAuthenticationBackend:
                         + timezone.timedelta(seconds=settings.AUTH_TOKEN_EXPIRY),
                     )
                 return user
+        except VerificationOverloaded:
+            raise
         except Exception as e:
             raise AuthenticationFailed("Authentication failed: " + str(e))
     
@@ -59,15 +155,23 @@ class WalletAuthenticationBackend:
         """
         Validates a given auth token against that stored in db.
         Returns the corresponding user object if token is valid.
+        Valid tokens are served from TokenCache until they expire.
         """
+        user = TokenCache.get(auth_token)
+        if user is not None:
+            return user
         auth_session = (
             UserAuthentication.objects.select_related("user")
             .filter(auth_token=auth_token, expiry__gt=timezone.now())
             .first()
         )
-        return auth_session.user if auth_session else None
+        if not auth_session:
+            return None
+        TokenCache.set(auth_token, auth_session.user, auth_session.expiry)
+        return auth_session.user
 
     @staticmethod
     def invalidate_auth_token(auth_token):
         """Invalidates an authentication token."""
         UserAuthentication.objects.filter(auth_token=auth_token).delete()
+        TokenCache.evict(auth_token)
@@ -4,6 +4,7 @@ from rest_framework.serializers import (
     CharField,
 )
 from .backends import WalletAuthenticationBackend
+from .verification import VerificationOverloaded
 from rest_framework.exceptions import AuthenticationFailed
 
 User = get_user_model()
@@ -21,6 +22,8 @@ class VerifySignatureSerializer(Serializer):
                 wallet_address=self.validated_data["wallet_address"],
                 signature=self.validated_data["signature"],
             )
+        except VerificationOverloaded:
+            raise
         except Exception as e:
             print(e)
             raise AuthenticationFailed(str(e))
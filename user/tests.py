@@ -1,3 +1,199 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from unittest import mock, skipUnless
+from garden.models import Garden
+from garden.services import PlantCatalog
+from .backends import TokenCache, WalletAuthenticationBackend
+from .models import User, UserAuthentication
+from .verification import SignatureVerifier, VerificationOverloaded
+import os
+import time
 
-# Create your tests here.
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+def sign_login(account, wallet_address=None):
+    """Signs the login message for a wallet, by default the account's own"""
+    wallet_address = (wallet_address or account.address).lower()
+    message = f"Sign in to Chain Gardens with wallet: {wallet_address}"
+    return Account.sign_message(
+        encode_defunct(text=message), private_key=account.key
+    ).signature.hex()
+
+
+def verification_settings(**overrides):
+    return override_settings(
+        AUTH_VERIFICATION={**settings.AUTH_VERIFICATION, **overrides}
+    )
+
+
+class VerifierTestMixin:
+    def tearDown(self):
+        if SignatureVerifier.executor is not None:
+            SignatureVerifier.executor.shutdown()
+            SignatureVerifier.executor = None
+        SignatureVerifier.pending = 0
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TokenCacheTestCase(TestCase):
+    def setUp(self):
+        TokenCache._local.clear()
+        PlantCatalog._local = None
+        PlantCatalog.get()
+        self.user = User.objects.create_user(wallet_address=f"0x{'cd' * 20}")
+        self.auth_session = UserAuthentication.objects.create(
+            user=self.user, expiry=timezone.now() + timedelta(days=1)
+        )
+        Garden.objects.create(owner=self.user)
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {self.auth_session.auth_token}"
+        )
+
+    def get_garden_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/v1/garden/")
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in queries.captured_queries]
+
+    def test_cached_token_skips_auth_queries(self):
+        auth_table = UserAuthentication._meta.db_table
+        # Token lookup, garden version, garden row and plants
+        queries = self.get_garden_queries()
+        self.assertEqual(len(queries), 4)
+        self.assertIn(auth_table, queries[0])
+        # Token and response both cached: only the garden version is read
+        queries = self.get_garden_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn(auth_table, queries[0])
+        self.assertNotIn(f'"{User._meta.db_table}"', queries[0])
+
+    def test_requests_get_their_own_user(self):
+        token = self.auth_session.auth_token
+        first = WalletAuthenticationBackend.validate_auth_token(token)
+        second = WalletAuthenticationBackend.validate_auth_token(token)
+        self.assertEqual(first.id, second.id)
+        self.assertIsNot(first, second)
+
+    def test_only_auth_fields_are_cached(self):
+        token = self.auth_session.auth_token
+        WalletAuthenticationBackend.validate_auth_token(token)
+        values, expiry = cache.get(TokenCache._get_key(token))
+        self.assertEqual(
+            values,
+            (self.user.id, self.user.wallet_address, None, True, False, False),
+        )
+        TokenCache._local.clear()
+        user = WalletAuthenticationBackend.validate_auth_token(token)
+        self.assertEqual(user.wallet_address, self.user.wallet_address)
+        # Fields outside the cached set load on first access
+        with self.assertNumQueries(1):
+            self.assertEqual(user.created, self.user.created)
+
+    def test_evicted_token_is_refused(self):
+        token = self.auth_session.auth_token
+        WalletAuthenticationBackend.validate_auth_token(token)
+        WalletAuthenticationBackend.invalidate_auth_token(token)
+        self.assertIsNone(WalletAuthenticationBackend.validate_auth_token(token))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SignatureVerifierTestCase(VerifierTestMixin, TestCase):
+    def setUp(self):
+        self.account = Account.create()
+        wallet_address = self.account.address.lower()
+        self.message = f"Sign in to Chain Gardens with wallet: {wallet_address}"
+
+    def test_recovers_the_signer_inline(self):
+        with verification_settings(POOL_SIZE=0):
+            self.assertEqual(
+                SignatureVerifier.recover(self.message, sign_login(self.account)),
+                self.account.address.lower(),
+            )
+
+    def test_recovers_the_signer_in_the_pool(self):
+        with verification_settings(POOL_SIZE=1):
+            self.assertEqual(
+                SignatureVerifier.recover(self.message, sign_login(self.account)),
+                self.account.address.lower(),
+            )
+
+    def test_signature_for_another_wallet_is_refused(self):
+        other = Account.create()
+        signature = sign_login(other, wallet_address=self.account.address)
+        with verification_settings(POOL_SIZE=0):
+            self.assertNotEqual(
+                SignatureVerifier.recover(self.message, signature),
+                self.account.address.lower(),
+            )
+            with self.assertRaisesMessage(AuthenticationFailed, "Invalid signature."):
+                WalletAuthenticationBackend().authenticate(
+                    None, wallet_address=self.account.address, signature=signature
+                )
+        self.assertFalse(User.objects.exists())
+
+    def test_full_queue_is_refused(self):
+        with verification_settings(POOL_SIZE=1, MAX_QUEUE_DEPTH=0):
+            with self.assertRaises(VerificationOverloaded):
+                SignatureVerifier.recover(self.message, sign_login(self.account))
+        self.assertEqual(SignatureVerifier.pending, 0)
+
+    def test_overloaded_login_returns_503(self):
+        with mock.patch.object(
+            SignatureVerifier, "recover", side_effect=VerificationOverloaded()
+        ):
+            response = APIClient().post(
+                "/api/v1/user/authenticate/",
+                {
+                    "wallet_address": self.account.address,
+                    "signature": sign_login(self.account),
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+
+@skipUnless(os.getenv("RUN_BENCHMARKS"), "Set RUN_BENCHMARKS to run benchmarks")
+class SignatureVerifierBenchmark(VerifierTestMixin, TestCase):
+    LOGINS = 200
+    CONCURRENCY = 16
+
+    def test_logins_per_second(self):
+        accounts = [Account.create() for _ in range(self.LOGINS)]
+        logins = [
+            (
+                f"Sign in to Chain Gardens with wallet: {account.address.lower()}",
+                sign_login(account),
+            )
+            for account in accounts
+        ]
+        for pool_size in [0, 1, 2, 4]:
+            with verification_settings(
+                POOL_SIZE=pool_size, MAX_QUEUE_DEPTH=self.LOGINS
+            ):
+                # Warm the pool so process start-up is not measured
+                SignatureVerifier.recover(*logins[0])
+                start = time.perf_counter()
+                with ThreadPoolExecutor(self.CONCURRENCY) as threads:
+                    list(threads.map(SignatureVerifier.recover, *zip(*logins)))
+                elapsed = time.perf_counter() - start
+                self.tearDown()
+            print(
+                f"Pool size {pool_size}: {self.LOGINS / elapsed:.0f} logins/sec "
+                f"with {self.CONCURRENCY} concurrent requests"
+            )
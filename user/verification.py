@@ -0,0 +1,85 @@
+"""
+Wallet signature verification off the request thread.
+Recovering a signer (keccak plus secp256k1 ecrecover) is CPU bound, so logins
+hand it to a bounded process pool instead of blocking web workers on it.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from django.conf import settings
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from rest_framework import status
+from rest_framework.exceptions import APIException
+import threading
+
+
+def recover_signer(message, signature):
+    """Returns the lowercased address that signed a text message"""
+    return Account.recover_message(
+        encode_defunct(text=message), signature=signature
+    ).lower()
+
+
+class VerificationOverloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many sign-in attempts in progress. Try again shortly."
+    default_code = "verification_overloaded"
+
+
+class SignatureVerifier:
+    """
+    Per-process pool of signature recovery workers.
+    Recoveries queue while the pool is busy; once MAX_QUEUE_DEPTH are in
+    flight, new ones fail fast with VerificationOverloaded.
+    """
+
+    _lock = threading.Lock()
+    executor = None
+    pending = 0
+
+    @classmethod
+    def get_executor(cls):
+        """Returns the pool, starting it on first use"""
+        with cls._lock:
+            if cls.executor is None:
+                cls.executor = ProcessPoolExecutor(
+                    max_workers=settings.AUTH_VERIFICATION["POOL_SIZE"]
+                )
+            return cls.executor
+
+    @classmethod
+    def _release(cls, future):
+        with cls._lock:
+            cls.pending -= 1
+
+    @classmethod
+    def recover(cls, message, signature):
+        """Recovers the signer of a message in the pool"""
+        if settings.AUTH_VERIFICATION["POOL_SIZE"] < 1:
+            # Pool disabled, recover on the calling thread
+            return recover_signer(message, signature)
+        executor = cls.get_executor()
+        with cls._lock:
+            if cls.pending >= settings.AUTH_VERIFICATION["MAX_QUEUE_DEPTH"]:
+                raise VerificationOverloaded()
+            cls.pending += 1
+        try:
+            future = executor.submit(recover_signer, message, signature)
+        except Exception:
+            with cls._lock:
+                cls.pending -= 1
+            raise
+        future.add_done_callback(cls._release)
+        try:
+            return future.result(timeout=settings.AUTH_VERIFICATION["TIMEOUT"])
+        except TimeoutError:
+            future.cancel()
+            raise VerificationOverloaded()
+
+    @classmethod
+    def get_stats(cls):
+        """Current pool size and recoveries in flight"""
+        return {
+            "pool_size": settings.AUTH_VERIFICATION["POOL_SIZE"],
+            "pending": cls.pending,
+        }
@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
 from .authentication import WalletTokenAuthentication
+from .verification import VerificationOverloaded
 from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
 
 
@@ -25,6 +26,13 @@ class AuthenticateUserView(APIView):
                     {"status": "success", "data": response_data},
                     status=status.HTTP_200_OK,
                 )
+        except VerificationOverloaded as e:
+            # Shed load instead of queueing logins behind a saturated pool
+            return Response(
+                {"status": "error", "error": str(e)},
+                status=e.status_code,
+                headers={"Retry-After": "1"},
+            )
         except (ValidationError, Exception) as e:
             return Response(
                 {"status": "error", "error": str(e)},